@@ -0,0 +1,36 @@
+"""gunicorn settings, loaded automatically from the working directory.
+
+Serves the WSGI app with sync workers by default. With ASYNC_VIEWS=1 it runs
+the ASGI app on uvicorn workers instead, and Django routes the async views.
+
+Workers share their metrics through files in PROMETHEUS_MULTIPROC_DIR; see
+info_site/metrics.py.
+"""
+import glob
+import os
+
+# prometheus_client picks its storage when first imported, so this must come
+# first; workers inherit it when they fork
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/risehub-metrics')
+
+from prometheus_client import multiprocess  # noqa: E402
+
+if os.environ.get('ASYNC_VIEWS') == '1':
+    wsgi_app = 'risehub.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'risehub.wsgi:application'
+
+
+def on_starting(server):
+    # Samples left by a previous run would be merged into the new one
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for stale in glob.glob(os.path.join(path, '*.db')):
+            os.remove(stale)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,36 +1,127 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
 from django.utils.html import format_html
 from .models import (
     Course, Cohort, WeekCurriculum, StudentProfile, Enrollment,
     InterestForm, ContactMessage, Webinar, WebinarRegistration,
-    InstructorProfile, CohortInstructor, Assignment, AssignmentSubmission
+    InstructorProfile, CohortInstructor, Assignment, AssignmentSubmission,
+    EmailOutbox, SlowQuery
 )
 
 
+# Bulk actions update at most this many rows per statement, so "select all"
+# on a large table never runs one long UPDATE behind a gunicorn timeout
+ACTION_CHUNK_SIZE = 2000
+
+
+def update_in_chunks(queryset, **values):
+    """Apply ``values`` to ``queryset`` in pk-ordered chunks; returns rows updated"""
+    manager = queryset.model._default_manager
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    updated = 0
+    last_pk = None
+    while True:
+        page = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        chunk = list(page[:ACTION_CHUNK_SIZE])
+        if not chunk:
+            return updated
+        updated += manager.filter(pk__in=chunk).update(**values)
+        last_pk = chunk[-1]
+
+
+class CohortFilter(admin.RelatedFieldListFilter):
+    """Related filter that labels cohorts from one joined query instead of one per cohort"""
+
+    def field_choices(self, field, request, model_admin):
+        cohorts = Cohort.objects.select_related('course')
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            cohorts = cohorts.order_by(*ordering)
+        return [(cohort.pk, str(cohort)) for cohort in cohorts]
+
+
+class AutocompleteTargetMixin:
+    """For admins that other admins' autocomplete_fields point at.
+
+    Autocomplete lookups search ``autocomplete_search_fields``, prefix
+    searches that the indexes of migration 0011 serve on PostgreSQL, and join
+    ``autocomplete_select_related`` so each label costs no extra query. The
+    changelist keeps its broader search_fields.
+    """
+    autocomplete_search_fields = ()
+    autocomplete_select_related = ()
+
+    @staticmethod
+    def is_autocomplete(request):
+        match = request.resolver_match
+        return match is not None and match.view_name == 'admin:autocomplete'
+
+    def get_search_fields(self, request):
+        if self.autocomplete_search_fields and self.is_autocomplete(request):
+            return self.autocomplete_search_fields
+        return super().get_search_fields(request)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.autocomplete_select_related and self.is_autocomplete(request):
+            queryset = queryset.select_related(*self.autocomplete_select_related)
+        return queryset
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class SiteUserAdmin(AutocompleteTargetMixin, UserAdmin):
+    autocomplete_search_fields = ['^username', '^email', '^first_name', '^last_name']
+
+
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(AutocompleteTargetMixin, admin.ModelAdmin):
     list_display = ['title', 'duration_weeks', 'price', 'currency', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['title', 'description']
+    autocomplete_search_fields = ['^title']
     readonly_fields = ['created_at', 'updated_at']
 
 
 class CohortInstructorInline(admin.TabularInline):
     model = CohortInstructor
     extra = 1
+    autocomplete_fields = ['instructor']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('instructor__user', 'cohort')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # The autocomplete widget labels each row's selected instructor from this queryset
+        if db_field.name == 'instructor':
+            kwargs['queryset'] = InstructorProfile.objects.select_related('user')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(Cohort)
-class CohortAdmin(admin.ModelAdmin):
+class CohortAdmin(AutocompleteTargetMixin, admin.ModelAdmin):
     list_display = ['name', 'course', 'start_date', 'end_date', 'status', 'enrollment_count', 'spots_remaining']
     list_filter = ['status', 'start_date', 'course']
     search_fields = ['name', 'course__title']
+    autocomplete_search_fields = ['^name', '^course__title']
+    autocomplete_select_related = ['course']
+    autocomplete_fields = ['course']
     readonly_fields = ['created_at', 'enrollment_count', 'spots_remaining']
     inlines = [CohortInstructorInline]
+    list_select_related = ['course']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_spots_left()
     
     def enrollment_count(self, obj):
         return obj.current_enrollment_count
     enrollment_count.short_description = 'Enrolled'
+    enrollment_count.admin_order_field = 'seats_taken'
     
     def spots_remaining(self, obj):
         remaining = obj.spots_remaining
@@ -41,6 +132,7 @@ class CohortAdmin(admin.ModelAdmin):
             remaining
         )
     spots_remaining.short_description = 'Spots Left'
+    spots_remaining.admin_order_field = 'spots_left'
 
 
 @admin.register(WeekCurriculum)
@@ -49,6 +141,7 @@ class WeekCurriculumAdmin(admin.ModelAdmin):
     list_filter = ['course']
     search_fields = ['title', 'description']
     ordering = ['course', 'week_number']
+    autocomplete_fields = ['course']
 
 
 @admin.register(StudentProfile)
@@ -57,6 +150,8 @@ class StudentProfileAdmin(admin.ModelAdmin):
     list_filter = ['tech_skill_level', 'owns_smartphone', 'owns_computer', 'preferred_contact']
     search_fields = ['user__username', 'user__email', 'user__first_name', 'user__last_name', 'phone_number']
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
 
 
 @admin.register(Enrollment)
@@ -72,6 +167,8 @@ class EnrollmentAdmin(admin.ModelAdmin):
         'cohort__name'
     ]
     readonly_fields = ['enrolled_at', 'updated_at']
+    list_select_related = ['student', 'cohort__course']
+    autocomplete_fields = ['student', 'cohort']
     
     fieldsets = (
         ('Enrollment Info', {
@@ -92,28 +189,39 @@ class EnrollmentAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_payment_status()
+    
     def payment_status(self, obj):
         if obj.is_paid:
             return format_html('<span style="color: green;">✓ Paid</span>')
         else:
             return format_html('<span style="color: red;">✗ Pending</span>')
     payment_status.short_description = 'Payment'
+    payment_status.admin_order_field = 'paid_in_full'
     
     actions = ['mark_as_enrolled', 'mark_as_paid']
     
     def mark_as_enrolled(self, request, queryset):
-        queryset.update(status='enrolled')
-        self.message_user(request, f'{queryset.count()} enrollment(s) marked as enrolled.')
+        # Collected first: the changelist filters (e.g. by status) may no
+        # longer match the rows once they are updated
+        cohort_ids = set(queryset.values_list('cohort_id', flat=True))
+        updated = update_in_chunks(queryset, status='enrolled', updated_at=timezone.now())
+        # update() skips the seat-counter signals
+        Cohort.objects.filter(pk__in=cohort_ids).recount_seats()
+        self.message_user(request, f'{updated} enrollment(s) marked as enrolled.')
     mark_as_enrolled.short_description = 'Mark selected as enrolled'
     
     def mark_as_paid(self, request, queryset):
-        from django.utils import timezone
-        for enrollment in queryset:
-            if enrollment.amount_paid == 0:
-                enrollment.amount_paid = enrollment.cohort.course.price
-                enrollment.payment_date = timezone.now()
-                enrollment.save()
-        self.message_user(request, f'{queryset.count()} enrollment(s) marked as paid.')
+        now = timezone.now()
+        course_price = Cohort.objects.filter(pk=OuterRef('cohort_id')).values('course__price')[:1]
+        updated = update_in_chunks(
+            queryset.filter(amount_paid=0),
+            amount_paid=Subquery(course_price),
+            payment_date=now,
+            updated_at=now,
+        )
+        self.message_user(request, f'{updated} enrollment(s) marked as paid.')
     mark_as_paid.short_description = 'Mark selected as paid'
 
 
@@ -126,6 +234,8 @@ class InterestFormAdmin(admin.ModelAdmin):
     list_filter = ['contacted', 'converted_to_enrollment', 'how_did_you_hear', 'interested_course', 'created_at']
     search_fields = ['full_name', 'email', 'phone_number']
     readonly_fields = ['created_at']
+    list_select_related = ['interested_course']
+    autocomplete_fields = ['interested_course', 'preferred_cohort']
     
     fieldsets = (
         ('Contact Information', {
@@ -146,13 +256,13 @@ class InterestFormAdmin(admin.ModelAdmin):
     actions = ['mark_as_contacted', 'mark_as_converted']
     
     def mark_as_contacted(self, request, queryset):
-        queryset.update(contacted=True)
-        self.message_user(request, f'{queryset.count()} lead(s) marked as contacted.')
+        updated = update_in_chunks(queryset, contacted=True)
+        self.message_user(request, f'{updated} lead(s) marked as contacted.')
     mark_as_contacted.short_description = 'Mark as contacted'
     
     def mark_as_converted(self, request, queryset):
-        queryset.update(converted_to_enrollment=True)
-        self.message_user(request, f'{queryset.count()} lead(s) marked as converted.')
+        updated = update_in_chunks(queryset, converted_to_enrollment=True)
+        self.message_user(request, f'{updated} lead(s) marked as converted.')
     mark_as_converted.short_description = 'Mark as converted to enrollment'
 
 
@@ -179,9 +289,8 @@ class ContactMessageAdmin(admin.ModelAdmin):
     actions = ['mark_as_responded']
     
     def mark_as_responded(self, request, queryset):
-        from django.utils import timezone
-        queryset.update(is_responded=True, responded_at=timezone.now())
-        self.message_user(request, f'{queryset.count()} message(s) marked as responded.')
+        updated = update_in_chunks(queryset, is_responded=True, responded_at=timezone.now())
+        self.message_user(request, f'{updated} message(s) marked as responded.')
     mark_as_responded.short_description = 'Mark as responded'
 
 
@@ -193,16 +302,21 @@ class WebinarRegistrationInline(admin.TabularInline):
 
 
 @admin.register(Webinar)
-class WebinarAdmin(admin.ModelAdmin):
+class WebinarAdmin(AutocompleteTargetMixin, admin.ModelAdmin):
     list_display = ['title', 'date', 'registration_count', 'spots_remaining', 'is_active']
     list_filter = ['is_active', 'date']
     search_fields = ['title', 'description']
+    autocomplete_search_fields = ['^title']
     readonly_fields = ['created_at', 'registration_count', 'spots_remaining']
     inlines = [WebinarRegistrationInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_spots_left()
+    
     def registration_count(self, obj):
         return obj.registration_count
     registration_count.short_description = 'Registrations'
+    registration_count.admin_order_field = 'seats_taken'
     
     def spots_remaining(self, obj):
         remaining = obj.spots_remaining
@@ -213,6 +327,7 @@ class WebinarAdmin(admin.ModelAdmin):
             remaining
         )
     spots_remaining.short_description = 'Spots Left'
+    spots_remaining.admin_order_field = 'spots_left'
 
 
 @admin.register(WebinarRegistration)
@@ -221,33 +336,74 @@ class WebinarRegistrationAdmin(admin.ModelAdmin):
     list_filter = ['attended', 'enrolled_after', 'webinar', 'registered_at']
     search_fields = ['full_name', 'email', 'phone']
     readonly_fields = ['registered_at']
+    list_select_related = ['webinar']
+    autocomplete_fields = ['webinar']
     
     actions = ['mark_as_attended']
     
     def mark_as_attended(self, request, queryset):
-        queryset.update(attended=True)
-        self.message_user(request, f'{queryset.count()} registration(s) marked as attended.')
+        updated = update_in_chunks(queryset, attended=True)
+        self.message_user(request, f'{updated} registration(s) marked as attended.')
     mark_as_attended.short_description = 'Mark as attended'
 
 
 @admin.register(InstructorProfile)
-class InstructorProfileAdmin(admin.ModelAdmin):
+class InstructorProfileAdmin(AutocompleteTargetMixin, admin.ModelAdmin):
     list_display = ['user', 'role', 'university', 'monthly_rate', 'is_active', 'joined_at']
     list_filter = ['role', 'is_active', 'joined_at']
     search_fields = ['user__username', 'user__email', 'user__first_name', 'user__last_name', 'university']
+    autocomplete_search_fields = ['^user__username', '^user__email', '^user__first_name', '^user__last_name']
+    autocomplete_select_related = ['user']
     readonly_fields = ['joined_at']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
 
 
 @admin.register(Assignment)
-class AssignmentAdmin(admin.ModelAdmin):
+class AssignmentAdmin(AutocompleteTargetMixin, admin.ModelAdmin):
     list_display = ['title', 'cohort', 'week_number', 'due_date']
-    list_filter = ['cohort', 'week_number']
+    list_filter = [('cohort', CohortFilter), 'week_number']
     search_fields = ['title', 'description']
+    autocomplete_search_fields = ['^title', '^cohort__name']
+    autocomplete_select_related = ['cohort']
+    list_select_related = ['cohort__course']
+    autocomplete_fields = ['cohort']
 
 
 @admin.register(AssignmentSubmission)
 class AssignmentSubmissionAdmin(admin.ModelAdmin):
     list_display = ['student', 'assignment', 'completed', 'score', 'submitted_at']
-    list_filter = ['completed', 'assignment__cohort', 'assignment__week_number']
+    list_filter = ['completed', ('assignment__cohort', CohortFilter), 'assignment__week_number']
     search_fields = ['student__username', 'student__email', 'assignment__title']
-    readonly_fields = ['submitted_at', 'graded_at']
\ No newline at end of file
+    readonly_fields = ['submitted_at', 'graded_at']
+    list_select_related = ['student', 'assignment__cohort']
+    autocomplete_fields = ['student', 'assignment']
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['to', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['to', 'subject']
+    readonly_fields = ['created_at', 'sent_at', 'attempts', 'last_error']
+    
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        updated = update_in_chunks(
+            queryset.exclude(status='sent'),
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} message(s) queued for another attempt.')
+    retry_now.short_description = 'Retry selected messages now'
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['url_name', 'duration_ms', 'fingerprint', 'created_at']
+    list_filter = ['url_name', 'created_at']
+    search_fields = ['sql', 'path', 'fingerprint']
+    readonly_fields = ['fingerprint', 'sql', 'params', 'duration_ms', 'url_name', 'path', 'stack', 'plan', 'created_at']
+    
+    def has_add_permission(self, request):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InfoSiteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'info_site'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,92 @@
+"""Async versions of the read-heavy pages, routed instead of the views in
+views.py when ASYNC_VIEWS is on (see urls.py).
+
+They pay off under an ASGI server (gunicorn with uvicorn workers, see
+gunicorn.conf.py): while a query or cache call is in flight the worker's event
+loop keeps serving other requests. Queries that don't depend on each other are
+started together with asyncio.gather. Templates are rendered with
+sync_to_async because the context processors touch the session and user lazily.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.utils import timezone
+
+from . import materials
+from .cache import SEAT_COUNT_TIMEOUT, cache_public_page
+from .models import Cohort, Course, Webinar, WeekCurriculum
+from .roles import aget_role
+
+arender = sync_to_async(render)
+
+
+async def _list(queryset):
+    return [obj async for obj in queryset]
+
+
+@cache_public_page('home', timeout=SEAT_COUNT_TIMEOUT)
+async def home(request):
+    courses, cohorts, webinars = await asyncio.gather(
+        _list(Course.objects.filter(is_active=True)),
+        _list(Cohort.objects.filter(status__in=['recruiting', 'planning']).order_by('start_date')[:3]),
+        _list(Webinar.objects.filter(is_active=True, date__gte=timezone.now()).order_by('date')[:2]),
+    )
+    context = {
+        'courses': courses,
+        'cohorts': cohorts,
+        'webinars': webinars,
+    }
+    return await arender(request, 'info_site/home.html', context)
+
+
+@cache_public_page('webinar_list', timeout=SEAT_COUNT_TIMEOUT)
+async def webinar_list_view(request):
+    webinars = await _list(
+        Webinar.objects.filter(is_active=True, date__gte=timezone.now()).order_by('date')
+    )
+    context = {
+        'webinars': webinars,
+        'page_title': 'Free Webinars',
+    }
+    return await arender(request, 'info_site/webinar_list.html', context)
+
+
+@cache_public_page('course:{course_id}')
+async def course_syllabus_view(request, course_id):
+    course, curriculum = await asyncio.gather(
+        aget_object_or_404(Course, id=course_id, is_active=True),
+        _list(WeekCurriculum.objects.filter(course_id=course_id).order_by('week_number')),
+    )
+    context = {
+        'course': course,
+        'curriculum': curriculum,
+        'page_title': course.title,
+    }
+    return await arender(request, 'info_site/course_syllabus.html', context)
+
+
+@login_required
+async def student_dashboard_view(request):
+    user = await request.auser()
+    role = await aget_role(user)
+    if role.is_admin:
+        return redirect('admin_dashboard')
+    elif role.is_instructor:
+        return redirect('instructor_dashboard')
+
+    enrollments = await _list(user.enrollments.for_dashboard().order_by('-enrolled_at'))
+    context = {
+        'enrollments': enrollments,
+        'page_title': 'My Dashboard',
+    }
+    return await arender(request, 'info_site/student_dashboard.html', context)
+
+
+@login_required
+async def cohort_materials_view(request, cohort_id):
+    user = await request.auser()
+    context = await sync_to_async(materials.page_context)(user, cohort_id)
+    context['page_title'] = f"{context['cohort'].name} - Materials"
+    return await arender(request, 'info_site/cohort_materials.html', context)
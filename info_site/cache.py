@@ -0,0 +1,111 @@
+"""Whole-page caching for anonymous visitors.
+
+Cached pages are keyed on the version of every content group they render,
+e.g. ``home`` or ``course:3``. info_site.signals bumps a group's version when
+the models behind it change, so stale entries are never read again and
+simply expire.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+from .middleware import record_cache_lookup
+
+PAGE_TIMEOUT = 60 * 15
+# Pages that show spots remaining; seat counters change without model signals
+SEAT_COUNT_TIMEOUT = 30
+
+
+def _version_key(group):
+    return f'pagever:{group}'
+
+
+def get_versions(groups):
+    """Return the current version token of each group, creating missing ones"""
+    keys = [_version_key(group) for group in groups]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(groups):
+    keys = [_version_key(group) for group in groups]
+    versions = await cache.aget_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(*groups):
+    """Invalidate every cached page that depends on one of ``groups``"""
+    cache.set_many({_version_key(group): time.time_ns() for group in groups}, timeout=None)
+
+
+def is_cacheable(request):
+    # Only cookies are inspected: touching request.user or the session would
+    # cost the queries the cache is meant to save.
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def _page_key(view, request, versions):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{view.__name__}:{path}:{'.'.join(str(v) for v in versions)}"
+
+
+def _should_store(response):
+    return response.status_code == 200 and not response.cookies
+
+
+def cache_public_page(*groups, timeout=PAGE_TIMEOUT):
+    """Serve a view from cache for anonymous GET requests.
+
+    ``groups`` may reference the view's URL kwargs, e.g. ``'course:{course_id}'``.
+    Works on both sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not is_cacheable(request):
+                    return await view(request, *args, **kwargs)
+
+                names = [group.format(**kwargs) for group in groups]
+                key = _page_key(view, request, await aget_versions(names))
+                response = await cache.aget(key)
+                record_cache_lookup(response is not None)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if _should_store(response):
+                        await cache.aset(key, response, timeout)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return view(request, *args, **kwargs)
+
+            names = [group.format(**kwargs) for group in groups]
+            key = _page_key(view, request, get_versions(names))
+            response = cache.get(key)
+            record_cache_lookup(response is not None)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if _should_store(response):
+                    cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,74 @@
+"""Cached course and cohort choices for the enrollment and interest forms.
+
+Each list is cached under its own key as small tuples, never model
+instances: ids and labels for the interest form's selects, plus the fields
+the enrollment page shows for open cohorts. Keys live in the ``choices``
+version group of info_site.cache, which info_site.signals bumps on every
+Course and Cohort change. Seat counts change without signals, so open
+cohorts expire after SEAT_COUNT_TIMEOUT like the other pages that show
+spots remaining.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .cache import SEAT_COUNT_TIMEOUT, get_versions
+from .middleware import record_cache_lookup
+from .models import Cohort, Course
+
+GROUP = 'choices'
+OPEN_STATUSES = ('recruiting', 'planning')
+
+Choice = namedtuple('Choice', ['id', 'label'])
+OpenCohort = namedtuple('OpenCohort', [
+    'id', 'label', 'name', 'start_date', 'end_date', 'meeting_day', 'meeting_time', 'spots_remaining',
+])
+
+
+def load_courses():
+    return [Choice(*row) for row in Course.objects.values_list('pk', 'title')]
+
+
+def load_cohorts():
+    return [
+        Choice(pk, f'{course_title} - {name}')
+        for pk, course_title, name in Cohort.objects.values_list('pk', 'course__title', 'name')
+    ]
+
+
+def load_open_cohorts():
+    rows = (
+        Cohort.objects.filter(status__in=OPEN_STATUSES)
+        .with_spots_left()
+        .order_by('start_date')
+        .values_list(
+            'pk', 'course__title', 'name', 'start_date', 'end_date', 'meeting_day', 'meeting_time', 'spots_left',
+        )
+    )
+    return [OpenCohort(pk, f'{course_title} - {name}', name, *rest) for pk, course_title, name, *rest in rows]
+
+
+def get_cached(name, load, timeout=DEFAULT_TIMEOUT):
+    key = f'{GROUP}:{name}:{get_versions([GROUP])[0]}'
+    entries = cache.get(key)
+    record_cache_lookup(entries is not None)
+    if entries is None:
+        entries = load()
+        cache.set(key, entries, timeout)
+    return entries
+
+
+def get_courses():
+    """``Choice`` tuples for every course"""
+    return get_cached('courses', load_courses)
+
+
+def get_cohorts():
+    """``Choice`` tuples for every cohort"""
+    return get_cached('cohorts', load_cohorts)
+
+
+def get_open_cohorts():
+    """``OpenCohort`` tuples for cohorts taking enrollments, soonest first"""
+    return get_cached('open_cohorts', load_open_cohorts, SEAT_COUNT_TIMEOUT)
@@ -1,14 +1,88 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from . import choices
 from .models import (
     InterestForm, ContactMessage, WebinarRegistration, 
-    StudentProfile, Enrollment
+    StudentProfile, Enrollment, Course, Cohort
 )
 
 
-class InterestFormSubmission(forms.ModelForm):
+class CachedModelChoiceField(forms.ChoiceField):
+    """ModelChoiceField over cached ``(id, label, ...)`` named tuples.
+
+    Rendering and validation use ``objects`` and never query. The cleaned
+    value is a ``model`` instance with the chosen pk and any other model
+    fields the entry carries, which is enough to assign or pass it on.
+    """
+    def __init__(self, model, *, empty_label='---------', **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+        self.empty_label = empty_label
+        self.objects = []
+
+    @property
+    def objects(self):
+        return self._objects
+
+    @objects.setter
+    def objects(self, objects):
+        self._objects = list(objects)
+        self._by_pk = {str(obj.id): obj for obj in self._objects}
+        self.choices = [('', self.empty_label)] + [(obj.id, obj.label) for obj in self._objects]
+
+    def prepare_value(self, value):
+        return getattr(value, 'pk', value)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            entry = self._by_pk[str(value)]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+            )
+        names = {field.attname for field in self.model._meta.concrete_fields}
+        instance = self.model(pk=entry.id, **{
+            name: value for name, value in entry._asdict().items() if name in names and name != 'id'
+        })
+        instance._state.adding = False
+        return instance
+
+    def validate(self, value):
+        # to_python() already rejected anything outside the cached ids
+        forms.Field.validate(self, value)
+
+    def has_changed(self, initial, data):
+        return str(self.prepare_value(initial) or '') != str(data or '')
+
+
+class CachedChoicesModelForm(forms.ModelForm):
+    """ModelForm whose CachedModelChoiceFields skip the model's foreign key
+    check, which would query for a row the cached ids already vouch for."""
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.update(
+            name for name, field in self.fields.items() if isinstance(field, CachedModelChoiceField)
+        )
+        return exclude
+
+
+class InterestFormSubmission(CachedChoicesModelForm):
     """Form for students to express interest in a course"""
+    interested_course = CachedModelChoiceField(
+        Course,
+        label='Which course interests you? *',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    preferred_cohort = CachedModelChoiceField(
+        Cohort,
+        required=False,
+        label='Preferred start date (if available)',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
     
     class Meta:
         model = InterestForm
@@ -35,12 +109,6 @@ class InterestFormSubmission(forms.ModelForm):
                 'placeholder': 'Your age (optional)',
                 'min': '1'
             }),
-            'interested_course': forms.Select(attrs={
-                'class': 'form-control'
-            }),
-            'preferred_cohort': forms.Select(attrs={
-                'class': 'form-control'
-            }),
             'how_did_you_hear': forms.Select(attrs={
                 'class': 'form-control'
             }),
@@ -55,16 +123,14 @@ class InterestFormSubmission(forms.ModelForm):
             'email': 'Email Address *',
             'phone_number': 'Phone Number *',
             'age': 'Age (optional)',
-            'interested_course': 'Which course interests you? *',
-            'preferred_cohort': 'Preferred start date (if available)',
             'how_did_you_hear': 'How did you hear about us?',
             'message': 'Questions or Comments',
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Make preferred_cohort optional
-        self.fields['preferred_cohort'].required = False
+        self.fields['interested_course'].objects = choices.get_courses()
+        self.fields['preferred_cohort'].objects = choices.get_cohorts()
         self.fields['age'].required = False
         self.fields['how_did_you_hear'].required = False
         self.fields['message'].required = False
@@ -251,8 +317,13 @@ class StudentProfileForm(forms.ModelForm):
         }
 
 
-class EnrollmentForm(forms.ModelForm):
+class EnrollmentForm(CachedChoicesModelForm):
     """Form for enrolling in a specific cohort"""
+    cohort = CachedModelChoiceField(
+        Cohort,
+        label='Select Course Start Date *',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
     agree_to_terms = forms.BooleanField(
         required=True,
         label="I agree to the course terms and payment policy"
@@ -261,20 +332,8 @@ class EnrollmentForm(forms.ModelForm):
     class Meta:
         model = Enrollment
         fields = ['cohort']
-        widgets = {
-            'cohort': forms.Select(attrs={
-                'class': 'form-control'
-            })
-        }
-        labels = {
-            'cohort': 'Select Course Start Date *'
-        }
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Only show active cohorts that are recruiting
-        from .models import Cohort
-        if isinstance(self.fields['cohort'], forms.ModelChoiceField):
-            self.fields['cohort'].queryset = Cohort.objects.filter(
-                status__in=['recruiting', 'planning']
-            ).order_by('start_date')
\ No newline at end of file
+        self.fields['cohort'].objects = choices.get_open_cohorts()
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from info_site import cache, materials
+from info_site.models import Cohort, WeekCurriculum
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild WeekCurriculum.topic_list and objective_list from the text fields, for rows '
+        'written without save(), e.g. by loaddata, bulk_create or queryset.update().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows written per statement')
+
+    def handle(self, *args, **options):
+        weeks = WeekCurriculum.objects.only('course', 'topics', 'learning_objectives', 'topic_list', 'objective_list')
+        changed = []
+        updated = 0
+        courses = set()
+        for week in weeks.iterator(chunk_size=options['batch_size']):
+            if week.parse_lists():
+                changed.append(week)
+                courses.add(week.course_id)
+            if len(changed) >= options['batch_size']:
+                updated += WeekCurriculum.objects.bulk_update(changed, ['topic_list', 'objective_list'])
+                changed = []
+        if changed:
+            updated += WeekCurriculum.objects.bulk_update(changed, ['topic_list', 'objective_list'])
+
+        # bulk_update sends no signals, so drop the cached pages here
+        if courses:
+            cache.bump(*[f'course:{course_id}' for course_id in courses])
+            materials.invalidate(*Cohort.objects.filter(course__in=courses).values_list('pk', flat=True))
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} curriculum week(s).'))
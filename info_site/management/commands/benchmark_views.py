@@ -0,0 +1,134 @@
+import io
+import json
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from info_site.probes import ISOLATED_CACHES, build_clients, build_probes, fetch
+
+
+class QueryTimer:
+    """execute_wrapper counting queries and timing them with perf_counter;
+    CaptureQueriesContext rounds each duration to the millisecond"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every route through the test Client against throwaway databases seeded '
+        'at increasing scales. Records wall time, query count and SQL time per route as JSON '
+        'and fails when a route regresses against a stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', type=float, default=[0.001, 0.01, 0.05],
+                            help='seed_risehub scales to benchmark, smallest first')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per route')
+        parser.add_argument('--output', help='Write the results JSON here (default: stdout)')
+        parser.add_argument('--baseline', help='Results JSON from an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative slowdown in median wall time before failing')
+        parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                            help='Ignore slowdowns smaller than this many milliseconds')
+
+    def handle(self, *args, **options):
+        with override_settings(CACHES=ISOLATED_CACHES):
+            results = self.benchmark(options)
+
+        payload = json.dumps(results, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+        problems = self.query_growth(results)
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+            problems += self.compare(results, baseline, options['tolerance'], options['min_delta_ms'])
+        if problems:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(problems))
+
+    def benchmark(self, options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = {'vendor': connection.vendor, 'repeat': options['repeat'], 'scales': {}}
+            for scale in sorted(options['scales']):
+                call_command('flush', interactive=False, verbosity=0)
+                call_command('seed_risehub', scale=scale, stdout=io.StringIO())
+                results['scales'][str(scale)] = self.run_probes(options['repeat'])
+                self.stderr.write(f'scale {scale}: {len(results["scales"][str(scale)])} routes benchmarked')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        return results
+
+    def run_probes(self, repeat):
+        clients = build_clients()
+        routes = {}
+        for probe in build_probes():
+            samples = []
+            for _ in range(repeat):
+                # Measure the view itself, not the public page cache
+                cache.clear()
+                timer = QueryTimer()
+                with connection.execute_wrapper(timer):
+                    started = time.perf_counter()
+                    response = fetch(clients, probe)
+                    wall = time.perf_counter() - started
+                if response is None:
+                    break
+                samples.append((wall, timer.count, timer.seconds, response.status_code))
+            if samples:
+                routes[probe.name] = {
+                    'status': samples[-1][3],
+                    'queries': max(s[1] for s in samples),
+                    'wall_ms': round(statistics.median(s[0] for s in samples) * 1000, 2),
+                    'sql_ms': round(statistics.median(s[2] for s in samples) * 1000, 2),
+                }
+        return routes
+
+    def query_growth(self, results):
+        """Routes whose query count grows with the dataset are N+1 suspects"""
+        scales = sorted(results['scales'], key=float)
+        smallest = results['scales'][scales[0]]
+        problems = []
+        for scale in scales[1:]:
+            for route, stats in results['scales'][scale].items():
+                if route in smallest and stats['queries'] > smallest[route]['queries']:
+                    problems.append(
+                        f"{route}: {smallest[route]['queries']} queries at scale {scales[0]}, "
+                        f"{stats['queries']} at scale {scale}"
+                    )
+        return problems
+
+    def compare(self, results, baseline, tolerance, min_delta_ms):
+        problems = []
+        for scale, routes in results['scales'].items():
+            for route, stats in routes.items():
+                before = baseline.get('scales', {}).get(scale, {}).get(route)
+                if before is None:
+                    continue
+                if stats['queries'] > before['queries']:
+                    problems.append(f"{route} @ {scale}: queries {before['queries']} -> {stats['queries']}")
+                slower = stats['wall_ms'] - before['wall_ms']
+                if slower > min_delta_ms and stats['wall_ms'] > before['wall_ms'] * (1 + tolerance):
+                    problems.append(f"{route} @ {scale}: wall {before['wall_ms']}ms -> {stats['wall_ms']}ms")
+        return problems
+
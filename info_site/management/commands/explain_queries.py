@@ -0,0 +1,89 @@
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import update_last_login
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from info_site.probes import ISOLATED_CACHES, build_clients, build_probes, fetch
+from info_site.routers import REPLICA
+
+
+@contextmanager
+def no_login_writes():
+    """Log the probe visitors in without touching last_login or the session table"""
+    user_logged_in.disconnect(dispatch_uid='update_last_login')
+    try:
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            yield
+    finally:
+        user_logged_in.connect(update_last_login, dispatch_uid='update_last_login')
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every page, bypassing the cache, and print the EXPLAIN plan of each SELECT it "
+        "runs on the database that served it. Use it on a database filled by seed_risehub to "
+        "check the indexes are used. Writes are rolled back unless a replica is configured, "
+        "where the rollback would keep every read on the primary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('routes', nargs='*', help='Only explain these route names, e.g. home admin:enrollment')
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE (PostgreSQL only)')
+
+    def handle(self, *args, **options):
+        if options['analyze'] and connection.vendor != 'postgresql':
+            raise CommandError('--analyze is only supported on PostgreSQL.')
+
+        with override_settings(CACHES=ISOLATED_CACHES), no_login_writes():
+            if REPLICA in settings.DATABASES:
+                self.explain_probes(options)
+            else:
+                with transaction.atomic():
+                    self.explain_probes(options)
+                    transaction.set_rollback(True)
+
+    def explain_probes(self, options):
+        probes = build_probes()
+        if options['routes']:
+            probes = [p for p in probes if p.name in options['routes']]
+        clients = build_clients()
+
+        for probe in probes:
+            cache.clear()
+            with ExitStack() as stack:
+                captured = {
+                    alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in settings.DATABASES
+                }
+                response = fetch(clients, probe)
+            if response is None:
+                self.stdout.write(self.style.WARNING(f'{probe.name}: skipped, no {probe.visitor} user'))
+                continue
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{probe.name} {probe.path} -> {response.status_code}, '
+                f'{sum(len(ctx) for ctx in captured.values())} queries'
+            ))
+            for alias, ctx in captured.items():
+                self.explain(alias, ctx.captured_queries, options['analyze'])
+
+    def explain(self, alias, queries, analyze):
+        db = connections[alias]
+        prefix = db.ops.explain_query_prefix(analyze=True) if analyze else db.ops.explain_query_prefix()
+        seen = set()
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                continue
+            seen.add(sql)
+            self.stdout.write(f'  [{alias}] {sql}')
+            with db.cursor() as cursor:
+                cursor.execute(f'{prefix} {sql}')
+                for row in cursor.fetchall():
+                    # SQLite returns (id, parent, notused, detail); PostgreSQL one text column
+                    self.stdout.write(f'    {row[-1]}')
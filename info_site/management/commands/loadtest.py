@@ -0,0 +1,411 @@
+import asyncio
+import json
+import random
+import re
+import ssl
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+
+from info_site.models import Course, Enrollment, Webinar
+
+Response = namedtuple('Response', ['status', 'headers', 'body'])
+
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+# Common/combined log format: 127.0.0.1 - - [10/Oct/2025:13:55:36 +0000] "GET /path HTTP/1.1" 200 ...
+LOG_LINE = re.compile(r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)')
+
+
+class Session:
+    """One simulated visitor: a keep-alive HTTP/1.1 connection with its own cookie jar"""
+
+    def __init__(self, base_url, forwarded_proto, timeout=None):
+        url = urlsplit(base_url)
+        self.timeout = timeout
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == 'https' else None
+        self.host_header = url.netloc
+        # Lets a production-settings server behind no proxy skip its HTTPS redirect
+        self.scheme = forwarded_proto or url.scheme
+        self.forwarded_proto = forwarded_proto
+        self.cookies = {}
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        return await self.request('GET', path)
+
+    async def post_form(self, path, page, form):
+        """POST ``form`` to ``path`` with the CSRF token from the already fetched ``page``"""
+        match = CSRF_INPUT.search(page.body)
+        if match:
+            form = dict(form, csrfmiddlewaretoken=match.group(1).decode())
+        return await self.request('POST', path, form)
+
+    async def request(self, method, path, form=None):
+        """Send one request; raises asyncio.TimeoutError after ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self.send(method, path, form), self.timeout)
+        except asyncio.TimeoutError:
+            # The connection may be mid-response, so it is never reused
+            await self.close()
+            raise
+
+    async def send(self, method, path, form):
+        body = urlencode(form).encode() if form is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host_header}',
+            'User-Agent: risehub-loadtest',
+            'Connection: keep-alive',
+        ]
+        if self.forwarded_proto:
+            lines.append(f'X-Forwarded-Proto: {self.forwarded_proto}')
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{k}={v}' for k, v in self.cookies.items()))
+        if form is not None:
+            origin = f'{self.scheme}://{self.host_header}'
+            lines += [
+                'Content-Type: application/x-www-form-urlencoded',
+                f'Content-Length: {len(body)}',
+                f'Origin: {origin}',
+                f'Referer: {origin}{path}',
+            ]
+        raw = ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                return await self.read_response(method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                await self.close()
+                if attempt:
+                    raise
+
+    async def read_response(self, method):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed before the response')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await self.reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                self.store_cookie(value)
+            headers[name] = value
+
+        if method == 'HEAD' or status in (204, 304):
+            # No body, whatever Content-Length says
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            await self.close()
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return Response(status, headers, body)
+
+    def store_cookie(self, header):
+        name, _, value = header.split(';', 1)[0].partition('=')
+        expired = 'max-age=0' in header.lower().replace(' ', '')
+        if expired or not value or value == '""':
+            self.cookies.pop(name, None)
+        else:
+            self.cookies[name] = value
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    async def timed(self, route, call):
+        started = time.perf_counter()
+        try:
+            response = await call
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - started)
+        self.statuses[route][response.status] += 1
+        if response.status >= 500:
+            self.errors[route] += 1
+        return response
+
+    def report(self, elapsed):
+        rows = {}
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies[route])
+            rows[route] = {
+                'requests': len(samples),
+                'errors': self.errors[route],
+                'rps': round(len(samples) / elapsed, 2),
+                'p50_ms': percentile(samples, 50),
+                'p95_ms': percentile(samples, 95),
+                'p99_ms': percentile(samples, 99),
+                'statuses': dict(self.statuses[route]),
+            }
+        everything = sorted(sample for samples in self.latencies.values() for sample in samples)
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'requests': len(everything),
+            'errors': sum(self.errors.values()),
+            'rps': round(len(everything) / elapsed, 2),
+            'p50_ms': percentile(everything, 50),
+            'p95_ms': percentile(everything, 95),
+            'p99_ms': percentile(everything, 99),
+            'routes': rows,
+        }
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, round(pct / 100 * (len(sorted_samples) - 1)))
+    return round(sorted_samples[index] * 1000, 2)
+
+
+class Flows:
+    """Visitor journeys; each takes a fresh Session and records every request by URL name"""
+
+    def __init__(self, stats, password=None):
+        self.stats = stats
+        self.password = password
+        now = timezone.now()
+        self.webinar_ids = list(
+            Webinar.objects.filter(is_active=True, date__gte=now).values_list('pk', flat=True)[:200]
+        )
+        self.course_ids = list(Course.objects.filter(is_active=True).values_list('pk', flat=True)[:50])
+        self.students = list(
+            Enrollment.objects.filter(status='enrolled')
+            .values_list('student__username', 'cohort_id')[:2000]
+        )
+        self.counter = 0
+
+    async def submit(self, session, route, path, form):
+        """Fetch a form page and submit it, timing the GET and the POST separately"""
+        page = await self.stats.timed(route, session.get(path))
+        if page is None:
+            return None
+        return await self.stats.timed(f'{route} [POST]', session.post_form(path, page, form))
+
+    async def browse_public(self, session):
+        await self.stats.timed('home', session.get(reverse('home')))
+        await self.stats.timed('webinar_list', session.get(reverse('webinar_list')))
+        if self.course_ids:
+            course_id = random.choice(self.course_ids)
+            await self.stats.timed('course_syllabus', session.get(reverse('course_syllabus', args=[course_id])))
+
+    async def webinar_signup(self, session):
+        await self.stats.timed('webinar_list', session.get(reverse('webinar_list')))
+        if not self.webinar_ids:
+            return await self.browse_public(session)
+        self.counter += 1
+        path = reverse('webinar_register', args=[random.choice(self.webinar_ids)])
+        await self.submit(session, 'webinar_register', path, {
+            'full_name': 'Load Test',
+            'email': f'loadtest-{time.time_ns()}-{self.counter}@example.org',
+            'phone': '+233 20 000 0000',
+        })
+
+    async def student_login(self, session, page_views=1):
+        if not self.students or not self.password:
+            return await self.browse_public(session)
+        username, cohort_id = random.choice(self.students)
+        response = await self.submit(session, 'login', reverse('login'), {
+            'username': username, 'password': self.password,
+        })
+        if response is None or response.status != 302:
+            return
+        for _ in range(page_views):
+            await self.stats.timed('student_dashboard', session.get(reverse('student_dashboard')))
+            await self.stats.timed('cohort_materials', session.get(reverse('cohort_materials', args=[cohort_id])))
+
+    async def student_session(self, session):
+        """A logged-in student clicking around; mostly uncached pages, few logins"""
+        await self.student_login(session, page_views=10)
+
+    async def admin_changelists(self, session):
+        if not self.password:
+            return await self.browse_public(session)
+        response = await self.submit(session, 'admin:login', reverse('admin:login'), {
+            'username': 'seed-admin', 'password': self.password, 'next': reverse('admin:index'),
+        })
+        if response is None or response.status != 302:
+            return
+        for name in ['enrollment', 'webinarregistration', 'interestform']:
+            url_name = f'admin:info_site_{name}_changelist'
+            await self.stats.timed(url_name, session.get(reverse(url_name)))
+
+
+SCENARIOS = {
+    'signup_spike': [('webinar_signup', 7), ('browse_public', 3)],
+    'login_storm': [('student_login', 8), ('browse_public', 2)],
+    'admin_mix': [('admin_changelists', 1), ('student_login', 4), ('browse_public', 5)],
+    'browse': [('browse_public', 1)],
+    'students': [('student_session', 1)],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server (e.g. gunicorn from the Procfile) with concurrent visitor '
+        'scenarios or a replayed access log, and report throughput and p50/p95/p99 latency per route.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls',
+                            help='Base URL of the server under test (default http://127.0.0.1:8000). '
+                                 'Repeat to run the same load against several servers one after another '
+                                 'and compare them, e.g. sync and uvicorn workers.')
+        parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='browse')
+        parser.add_argument('--replay', help='Replay GET/HEAD requests from a common/combined format access log')
+        parser.add_argument('--speed', type=float, default=0,
+                            help='Replay at this multiple of the logged pace (0 = as fast as possible)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous virtual visitors')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run a scenario for')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Seconds before a request counts as an error and its connection is dropped')
+        parser.add_argument('--forwarded-proto', default='https',
+                            help="X-Forwarded-Proto to send so production settings don't redirect (empty to omit)")
+        parser.add_argument('--password',
+                            help='Password of the seed users, as printed by seed_risehub; '
+                                 'without it the login flows browse public pages instead')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        reports = {}
+        for url in options['urls'] or ['http://127.0.0.1:8000']:
+            stats = Stats()
+            started = time.perf_counter()
+            if options['replay']:
+                asyncio.run(self.replay(stats, options, url))
+            else:
+                asyncio.run(self.run_scenario(Flows(stats, options['password']), options, url))
+            reports[url] = stats.report(time.perf_counter() - started)
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports if len(reports) > 1 else reports[url], indent=2))
+            return
+        for url, report in reports.items():
+            self.write_report(url, report)
+        if len(reports) > 1:
+            self.stdout.write(self.style.MIGRATE_HEADING('comparison'))
+            self.write_table('server', reports.items())
+
+    def write_report(self, url, report):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{url}: {report['requests']} requests in {report['elapsed_s']}s ({report['rps']} req/s)"
+        ))
+        self.write_table('route', report['routes'].items())
+
+    def write_table(self, heading, rows):
+        self.stdout.write(f"{heading:<45}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for name, row in rows:
+            self.stdout.write(
+                f"{name:<45}{row['requests']:>7}{row['errors']:>6}{row['rps']:>9}"
+                f"{row['p50_ms'] or '-':>9}{row['p95_ms'] or '-':>9}{row['p99_ms'] or '-':>9}"
+            )
+
+    def session(self, options, url):
+        return Session(url, options['forwarded_proto'], options['timeout'])
+
+    async def run_scenario(self, flows, options, url):
+        names, weights = zip(*SCENARIOS[options['scenario']])
+        deadline = time.monotonic() + options['duration']
+
+        async def visitor():
+            while time.monotonic() < deadline:
+                session = self.session(options, url)
+                try:
+                    flow = getattr(flows, random.choices(names, weights)[0])
+                    await flow(session)
+                finally:
+                    await session.close()
+
+        await asyncio.gather(*(visitor() for _ in range(options['concurrency'])))
+
+    async def replay(self, stats, options, url):
+        try:
+            with open(options['replay']) as fh:
+                entries = [m for m in map(LOG_LINE.search, fh) if m and m['method'] in ('GET', 'HEAD')]
+        except OSError as exc:
+            raise CommandError(f'Cannot read {options["replay"]}: {exc}')
+        if options['speed']:
+            # Pacing needs every timestamp; drop the lines without a readable one
+            timed = [(entry, parse_log_time(entry['time'])) for entry in entries]
+            entries = [(entry, when) for entry, when in timed if when is not None]
+            if len(entries) < len(timed):
+                self.stderr.write(f'Skipped {len(timed) - len(entries)} line(s) with an unreadable timestamp.')
+        else:
+            entries = [(entry, None) for entry in entries]
+        if not entries:
+            raise CommandError('No GET/HEAD requests found in the log.')
+
+        first = entries[0][1]
+        queue = asyncio.Queue()
+        for entry in entries:
+            queue.put_nowait(entry)
+        start = time.monotonic()
+
+        async def worker():
+            session = self.session(options, url)
+            try:
+                while not queue.empty():
+                    entry, when = queue.get_nowait()
+                    if options['speed']:
+                        offset = (when - first).total_seconds() / options['speed']
+                        await asyncio.sleep(max(0, start + offset - time.monotonic()))
+                    await stats.timed(route_name(entry['path']), session.request(entry['method'], entry['path']))
+            finally:
+                await session.close()
+
+        await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+
+
+def parse_log_time(value):
+    try:
+        return datetime.strptime(value, '%d/%b/%Y:%H:%M:%S %z')
+    except ValueError:
+        return None
+
+
+def route_name(path):
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return 'unresolved'
+    return match.view_name
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from info_site.models import Cohort, Webinar
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized seats_taken counters on cohorts and webinars'
+
+    def handle(self, *args, **options):
+        cohorts = Cohort.objects.recount_seats()
+        webinars = Webinar.objects.recount_seats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted seats for {cohorts} cohort(s) and {webinars} webinar(s).'
+        ))
@@ -0,0 +1,59 @@
+"""Outbox worker.
+
+Runs as its own process next to the web server: the Procfile's ``worker``
+entry, or on Railway a second service from this repository whose config file
+path is set to railway.worker.json. Without it queued email is never sent.
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from info_site.metrics import start_exporter
+from info_site.outbox import deliver_batch
+
+logger = logging.getLogger('info_site.outbox')
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox in batches, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Messages per batch (default OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once drained')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when idle in --loop mode')
+        parser.add_argument(
+            '--metrics-port', type=int,
+            help='Serve this worker\'s email counters for Prometheus on this port (same auth as /metrics)',
+        )
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_exporter(options['metrics_port'])
+        totals = {'sent': 0, 'retried': 0, 'dead': 0}
+        while True:
+            if options['loop']:
+                # Drop a connection the database closed or broke, as the
+                # request cycle does, so the next batch gets a fresh one
+                close_old_connections()
+                try:
+                    counts = deliver_batch(options['batch_size'])
+                except DatabaseError:
+                    logger.exception('Outbox batch failed; retrying')
+                    time.sleep(options['interval'])
+                    continue
+            else:
+                counts = deliver_batch(options['batch_size'])
+            for key, value in counts.items():
+                totals[key] += value
+            if any(counts.values()):
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            f"Outbox drained: {totals['sent']} sent, {totals['retried']} to retry, "
+            f"{totals['dead']} dead-lettered."
+        )
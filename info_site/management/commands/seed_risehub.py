@@ -0,0 +1,362 @@
+import random
+import secrets
+import time
+from datetime import datetime, time as clock, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from info_site.models import (
+    Course, Cohort, WeekCurriculum, UserProfile, StudentProfile, Enrollment,
+    InterestForm, ContactMessage, Webinar, WebinarRegistration,
+    InstructorProfile, CohortInstructor, Assignment, AssignmentSubmission
+)
+
+# Row counts at --scale 1, roughly production a few years out
+VOLUMES = {
+    'users': 100_000,
+    'instructors': 200,
+    'courses': 20,
+    'cohorts': 5_000,
+    'enrollments': 500_000,
+    'submissions': 500_000,
+    'webinars': 1_000,
+    'registrations': 2_000_000,
+    'leads': 50_000,
+    'messages': 20_000,
+}
+
+FIRST_NAMES = [
+    'Ama', 'Kofi', 'Akosua', 'Kwame', 'Esi', 'Yaw', 'Abena', 'Kwabena', 'Adwoa', 'Kojo',
+    'Afua', 'Kwaku', 'Efua', 'Kwesi', 'Yaa', 'Fiifi', 'Comfort', 'Emmanuel', 'Grace', 'Samuel',
+]
+LAST_NAMES = [
+    'Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Agyeman', 'Appiah', 'Darko', 'Addo', 'Ofori',
+    'Quaye', 'Tetteh', 'Amoah', 'Sarpong', 'Ansah', 'Frimpong', 'Acheampong', 'Nkrumah', 'Annan', 'Badu',
+]
+TOPICS = [
+    'Turning the device on and off', 'Making calls', 'Sending text messages', 'Using WhatsApp',
+    'Taking photos', 'Video calls with family', 'Mobile money safety', 'Spotting scams',
+    'Searching the web', 'Using email', 'Online banking', 'Health information online',
+]
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill an empty database with a deterministic, production-sized graph of every '
+        'info_site model. Uses chunked bulk_create, one shared password hash and no signals.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.01,
+                            help='Multiplier for the row counts in VOLUMES (1.0 is ~3.3M rows)')
+        parser.add_argument('--seed', type=int, default=2025, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk_create call')
+        parser.add_argument('--password',
+                            help='Password for every seeded account, including the superuser seed-admin '
+                                 '(default: a random one, printed at the end)')
+        parser.add_argument('--force', action='store_true',
+                            help='Seed even though the database already has users or courses')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username='seed-admin').exists():
+            raise CommandError('This database already contains seed data; run `manage.py flush` first.')
+        if not (settings.DEBUG or options['force']) and (User.objects.exists() or Course.objects.exists()):
+            raise CommandError(
+                'This database already has users or courses and seeding adds a superuser; '
+                'run it on an empty database, with DEBUG on, or pass --force.'
+            )
+
+        self.password = options['password'] or secrets.token_urlsafe(12)
+
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.volumes = {
+            name: max(1, int(count * options['scale'])) for name, count in VOLUMES.items()
+        }
+        self.volumes['instructors'] = max(2, min(self.volumes['instructors'], self.volumes['users'] // 2))
+        self.today = timezone.now().date()
+        started = time.monotonic()
+
+        self.seed_users()
+        self.seed_courses()
+        self.seed_cohorts()
+        self.seed_enrollments()
+        self.seed_webinars()
+        self.seed_leads()
+
+        # bulk_create bypasses the seat counter signals
+        Cohort.objects.recount_seats()
+        Webinar.objects.recount_seats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded in {time.monotonic() - started:.1f}s. '
+            f"Log in as seed-admin (or any seed user) with password '{self.password}'."
+        ))
+
+    # Helpers
+
+    def insert(self, model, rows):
+        """bulk_create any iterable of unsaved instances in chunks"""
+        started = time.monotonic()
+        rows = iter(rows)
+        total = 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            model.objects.bulk_create(chunk, batch_size=self.chunk_size)
+            total += len(chunk)
+        self.stdout.write(f'  {model._meta.verbose_name_plural}: {total} in {time.monotonic() - started:.1f}s')
+        return total
+
+    def name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def phone(self):
+        return f'+233 {self.rng.randint(20, 59)} {self.rng.randint(100, 999)} {self.rng.randint(1000, 9999)}'
+
+    def aware(self, day, hour=18):
+        return timezone.make_aware(datetime.combine(day, clock(hour)))
+
+    # Seeders
+
+    def seed_users(self):
+        password = make_password(self.password)
+        count = self.volumes['users']
+        instructors = self.volumes['instructors']
+
+        def users():
+            yield User(username='seed-admin', email='seed-admin@example.org', password=password,
+                       is_staff=True, is_superuser=True)
+            for i in range(count):
+                first, last = self.name()
+                yield User(username=f'seed{i:07d}', first_name=first, last_name=last,
+                           email=f'seed{i:07d}@example.org', password=password)
+        self.insert(User, users())
+
+        ids = list(User.objects.filter(username__startswith='seed0').order_by('username').values_list('pk', flat=True))
+        self.instructor_user_ids = ids[:instructors]
+        self.student_ids = ids[instructors:]
+        admin_id = User.objects.get(username='seed-admin').pk
+
+        self.insert(UserProfile, (
+            UserProfile(user_id=pk, role='instructor' if n < instructors else 'senior')
+            for n, pk in enumerate(ids)
+        ))
+        UserProfile.objects.create(user_id=admin_id, role='admin')
+        self.insert(StudentProfile, (
+            StudentProfile(
+                user_id=pk,
+                phone_number=self.phone(),
+                tech_skill_level=self.rng.choice(['beginner', 'beginner', 'basic', 'intermediate']),
+                owns_smartphone=self.rng.random() < 0.8,
+                owns_computer=self.rng.random() < 0.3,
+                preferred_contact=self.rng.choice(['phone', 'email', 'whatsapp']),
+            )
+            for pk in self.student_ids
+        ))
+        self.insert(InstructorProfile, (
+            InstructorProfile(
+                user_id=pk,
+                role='lead' if n % 4 == 0 else 'supporting',
+                university='University of Ghana',
+                monthly_rate=Decimal(self.rng.choice(['300.00', '450.00', '600.00'])),
+            )
+            for n, pk in enumerate(self.instructor_user_ids)
+        ))
+        self.instructor_ids = list(InstructorProfile.objects.order_by('pk').values_list('pk', flat=True))
+
+    def seed_courses(self):
+        self.insert(Course, (
+            Course(
+                title=f'Digital Literacy {101 + i}',
+                description='Hands-on technology skills for older adults.',
+                duration_weeks=6,
+                price=Decimal(self.rng.choice(['0.00', '150.00', '250.00', '400.00'])),
+            )
+            for i in range(self.volumes['courses'])
+        ))
+        self.course_prices = dict(Course.objects.order_by('pk').values_list('pk', 'price'))
+
+        def weeks():
+            for course_id in self.course_prices:
+                for week_number in range(1, 7):
+                    week = WeekCurriculum(
+                        course_id=course_id,
+                        week_number=week_number,
+                        title=f'Week {week_number}: {self.rng.choice(TOPICS)}',
+                        description='Guided practice with a facilitator.',
+                        topics='\n'.join(self.rng.sample(TOPICS, 4)),
+                        learning_objectives='\n'.join(self.rng.sample(TOPICS, 2)),
+                    )
+                    # Bulk inserts skip save(), which fills the lists
+                    week.parse_lists()
+                    yield week
+
+        self.insert(WeekCurriculum, weeks())
+
+    def seed_cohorts(self):
+        course_ids = list(self.course_prices)
+
+        def cohorts():
+            for i in range(self.volumes['cohorts']):
+                # Spread start dates from two years back to six months ahead
+                start = self.today + timedelta(days=self.rng.randint(-730, 180))
+                end = start + timedelta(weeks=6)
+                if end < self.today:
+                    status = 'completed' if self.rng.random() < 0.95 else 'cancelled'
+                elif start <= self.today:
+                    status = 'active'
+                else:
+                    status = self.rng.choice(['recruiting', 'recruiting', 'planning'])
+                yield Cohort(
+                    course_id=course_ids[i % len(course_ids)],
+                    name=f'Cohort {i + 1} - {start:%B %Y}',
+                    start_date=start,
+                    end_date=end,
+                    status=status,
+                    max_students=self.rng.randint(15, 150),
+                    meeting_day=self.rng.choice(WEEKDAYS),
+                    meeting_time=clock(self.rng.choice([10, 14, 17])),
+                    zoom_link=f'https://zoom.us/j/{9000000000 + i}',
+                )
+        self.insert(Cohort, cohorts())
+        self.cohorts = list(Cohort.objects.order_by('pk').values_list('pk', 'course_id', 'status', 'start_date'))
+
+        self.insert(CohortInstructor, (
+            CohortInstructor(cohort_id=pk, instructor_id=instructor_id, role=role)
+            for pk, *_ in self.cohorts
+            for instructor_id, role in zip(self.rng.sample(self.instructor_ids, 2), ['lead', 'supporting'])
+        ))
+        self.insert(Assignment, (
+            Assignment(
+                cohort_id=pk,
+                week_number=week,
+                title=f'Week {week} flashcards',
+                description='Practice the words and steps from class.',
+                quizlet_url='https://quizlet.com/',
+                due_date=self.aware(start + timedelta(weeks=week)),
+            )
+            for pk, _, _, start in self.cohorts
+            for week in range(1, 7)
+        ))
+
+    def seed_enrollments(self):
+        per_cohort = max(1, self.volumes['enrollments'] // len(self.cohorts))
+        per_cohort = min(per_cohort, len(self.student_ids))
+        statuses = {
+            'completed': (['completed'] * 8 + ['dropped'] * 2),
+            'cancelled': ['cancelled'],
+            'active': (['enrolled'] * 8 + ['dropped', 'pending']),
+            'recruiting': ['interested', 'assessment_scheduled', 'pending', 'pending', 'enrolled'],
+            'planning': ['interested', 'interested', 'pending'],
+        }
+        # (cohort, student) pairs that can have assignment submissions
+        self.attending = []
+
+        def enrollments():
+            for pk, course_id, cohort_status, _ in self.cohorts:
+                price = self.course_prices[course_id]
+                for student_id in self.rng.sample(self.student_ids, per_cohort):
+                    status = self.rng.choice(statuses[cohort_status])
+                    paid = status in ('enrolled', 'completed') or self.rng.random() < 0.2
+                    if status in ('enrolled', 'completed'):
+                        self.attending.append((pk, student_id))
+                    yield Enrollment(
+                        student_id=student_id,
+                        cohort_id=pk,
+                        status=status,
+                        amount_paid=price if paid else Decimal('0.00'),
+                        payment_method='mobile_money' if paid else '',
+                        attendance_count=self.rng.randint(0, 6) if status in ('enrolled', 'completed') else 0,
+                    )
+        self.insert(Enrollment, enrollments())
+
+        assignments = {}
+        for pk, cohort_id in Assignment.objects.values_list('pk', 'cohort_id'):
+            assignments.setdefault(cohort_id, []).append(pk)
+        chance = min(1.0, self.volumes['submissions'] / max(1, len(self.attending) * 6))
+
+        def submissions():
+            for cohort_id, student_id in self.attending:
+                for assignment_id in assignments.get(cohort_id, []):
+                    if self.rng.random() >= chance:
+                        continue
+                    completed = self.rng.random() < 0.85
+                    yield AssignmentSubmission(
+                        assignment_id=assignment_id,
+                        student_id=student_id,
+                        completed=completed,
+                        score=self.rng.randint(40, 100) if completed else None,
+                    )
+        self.insert(AssignmentSubmission, submissions())
+        del self.attending
+
+    def seed_webinars(self):
+        count = self.volumes['webinars']
+        per_webinar = max(1, self.volumes['registrations'] // count)
+        self.insert(Webinar, (
+            Webinar(
+                title=f'Free Webinar: {self.rng.choice(TOPICS)}',
+                description='A friendly one-hour introduction.',
+                date=self.aware(self.today + timedelta(days=self.rng.randint(-365, 60)), hour=self.rng.choice([10, 16])),
+                zoom_link=f'https://zoom.us/j/{8000000000 + i}',
+                registration_limit=per_webinar + self.rng.randint(0, per_webinar // 4 + 5),
+                is_active=self.rng.random() < 0.95,
+            )
+            for i in range(count)
+        ))
+
+        def registrations():
+            for pk in Webinar.objects.order_by('pk').values_list('pk', flat=True).iterator():
+                for n in range(per_webinar):
+                    first, last = self.name()
+                    yield WebinarRegistration(
+                        webinar_id=pk,
+                        full_name=f'{first} {last}',
+                        email=f'guest{pk}-{n}@example.org',
+                        phone=self.phone(),
+                        attended=self.rng.random() < 0.6,
+                        enrolled_after=self.rng.random() < 0.1,
+                    )
+        self.insert(WebinarRegistration, registrations())
+
+    def seed_leads(self):
+        course_ids = list(self.course_prices)
+        open_cohorts = [pk for pk, _, status, _ in self.cohorts if status in ('recruiting', 'planning')]
+        choices = [value for value, _ in InterestForm.HOW_HEARD_CHOICES]
+
+        def leads():
+            for i in range(self.volumes['leads']):
+                first, last = self.name()
+                yield InterestForm(
+                    full_name=f'{first} {last}',
+                    email=f'lead{i}@example.org',
+                    phone_number=self.phone(),
+                    age=self.rng.randint(45, 85),
+                    interested_course_id=self.rng.choice(course_ids),
+                    preferred_cohort_id=self.rng.choice(open_cohorts) if open_cohorts and self.rng.random() < 0.5 else None,
+                    how_did_you_hear=self.rng.choice(choices),
+                    contacted=self.rng.random() < 0.7,
+                    converted_to_enrollment=self.rng.random() < 0.2,
+                )
+        self.insert(InterestForm, leads())
+
+        def contact_messages():
+            for i in range(self.volumes['messages']):
+                first, last = self.name()
+                yield ContactMessage(
+                    name=f'{first} {last}',
+                    email=f'contact{i}@example.org',
+                    phone=self.phone(),
+                    subject=self.rng.choice(['Class times', 'Payment', 'Device help', 'Volunteering']),
+                    message='Please call me back about the course.',
+                    is_responded=self.rng.random() < 0.8,
+                )
+        self.insert(ContactMessage, contact_messages())
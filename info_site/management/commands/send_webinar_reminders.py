@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from info_site.metrics import count_emails
+from info_site.models import EmailOutbox, Webinar
+
+NAME_PLACEHOLDER = '[[full_name]]'
+
+
+def reminder_message(webinar):
+    """Return (subject, body) for a webinar; the body carries NAME_PLACEHOLDER"""
+    subject = f'Reminder: {webinar.title} starts soon'
+    body = f'''
+Dear {NAME_PLACEHOLDER},
+
+This is a reminder that our free webinar starts soon.
+
+Webinar: {webinar.title}
+Date & Time: {webinar.date.strftime('%B %d, %Y at %I:%M %p')}
+Duration: {webinar.duration_minutes} minutes
+
+Zoom Link: {webinar.zoom_link}
+
+We look forward to seeing you!
+
+Best regards,
+The Rise Hub Team
+    '''
+    return subject, body
+
+
+class Command(BaseCommand):
+    help = (
+        'Queue reminder emails for registrants of webinars starting soon. '
+        'Registrations are marked as reminded, so it is safe to run on a schedule.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Remind for webinars starting within this many hours')
+        parser.add_argument('--batch-size', type=int, default=500, help='Registrations queued per transaction')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        webinars = Webinar.objects.filter(
+            is_active=True,
+            date__gt=now,
+            date__lte=now + timedelta(hours=options['hours']),
+        ).order_by('date')
+
+        total = 0
+        for webinar in webinars:
+            sent = self.remind(webinar, options['batch_size'])
+            total += sent
+            self.stdout.write(f'{webinar}: {sent} reminder(s) queued')
+        self.stdout.write(self.style.SUCCESS(f'Queued {total} reminder(s).'))
+
+    def remind(self, webinar, batch_size):
+        subject, body = reminder_message(webinar)
+        registrations = (
+            webinar.registrations.filter(reminded_at__isnull=True)
+            .order_by('pk')
+            .only('pk', 'full_name', 'email')
+            .iterator(chunk_size=batch_size)
+        )
+        queued = 0
+        batch = []
+        for registration in registrations:
+            batch.append(registration)
+            if len(batch) >= batch_size:
+                queued += self.queue(webinar, subject, body, batch)
+                batch = []
+        if batch:
+            queued += self.queue(webinar, subject, body, batch)
+        return queued
+
+    def queue(self, webinar, subject, body, registrations):
+        with transaction.atomic():
+            EmailOutbox.objects.bulk_create([
+                EmailOutbox(
+                    to=registration.email,
+                    subject=subject,
+                    body=body.replace(NAME_PLACEHOLDER, registration.full_name),
+                )
+                for registration in registrations
+            ])
+            webinar.registrations.filter(
+                pk__in=[registration.pk for registration in registrations]
+            ).update(reminded_at=timezone.now())
+        count_emails('queued', len(registrations))
+        return len(registrations)
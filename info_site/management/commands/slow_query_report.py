@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from info_site.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize captured slow queries by normalized SQL fingerprint, worst total time first, '
+        'with the pages that ran them and the latest sample and plan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=7, help='Only include queries captured this recently')
+        parser.add_argument('--limit', type=int, default=10, help='Number of fingerprints to show')
+        parser.add_argument('--plans', action='store_true', help='Print the EXPLAIN plan of each sample')
+        parser.add_argument('--purge', action='store_true', help='Delete captures older than --days instead')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        if options['purge']:
+            deleted, _ = SlowQuery.objects.filter(created_at__lt=since).delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} slow quer(ies).'))
+            return
+
+        recent = SlowQuery.objects.filter(created_at__gte=since)
+        groups = list(
+            recent.values('fingerprint')
+            .annotate(count=Count('id'), total=Sum('duration_ms'), avg=Avg('duration_ms'),
+                      worst=Max('duration_ms'), latest=Max('id'))
+            .order_by('-total')[:options['limit']]
+        )
+        if not groups:
+            self.stdout.write('No slow queries captured.')
+            return
+
+        samples = SlowQuery.objects.in_bulk([group['latest'] for group in groups])
+        pages = {}
+        for row in (recent.filter(fingerprint__in=[group['fingerprint'] for group in groups])
+                    .values('fingerprint', 'url_name').annotate(count=Count('id')).order_by('-count')):
+            pages.setdefault(row['fingerprint'], []).append(f"{row['url_name']} x{row['count']}")
+
+        for rank, group in enumerate(groups, 1):
+            sample = samples[group['latest']]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{rank}. {group['fingerprint'][:12]}: {group['count']} slow run(s), "
+                f"total {group['total']:.0f}ms, avg {group['avg']:.0f}ms, worst {group['worst']:.0f}ms"
+            ))
+            self.stdout.write(f"   pages: {', '.join(pages.get(group['fingerprint'], []))}")
+            self.stdout.write(f'   sql: {sample.sql}')
+            if sample.params:
+                self.stdout.write(f'   params: {sample.params}')
+            for line in sample.stack.splitlines():
+                self.stdout.write(f'   at {line}')
+            if options['plans'] and sample.plan:
+                for line in sample.plan.splitlines():
+                    self.stdout.write(f'     {line}')
@@ -0,0 +1,96 @@
+"""Cached data for the cohort materials page.
+
+Students open this page again and again during class. Everything on it that is
+the same for the whole cohort (the cohort and course, curriculum weeks,
+assignments and instructors) is cached as one payload per cohort, dropped by
+info_site.signals when any of those rows change. A granted access is remembered
+for ACCESS_TIMEOUT, so a warm request only queries the student's own assignment
+submissions; denials are not cached, as enrollments are also changed with
+queryset updates that send no signals. The signals only reach other worker
+processes through a shared cache, so without SHARED_CACHE both entries expire
+after LOCAL_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .middleware import record_cache_lookup
+from .models import AssignmentSubmission, Cohort, Enrollment
+
+MATERIALS_TIMEOUT = 60 * 60
+ACCESS_TIMEOUT = 60 * 5
+LOCAL_TIMEOUT = 60
+ACCESS_STATUSES = ('enrolled', 'completed')
+
+
+def _key(cohort_id):
+    return f'materials:{cohort_id}'
+
+
+def _access_key(user_id, cohort_id):
+    return f'materials_access:{user_id}:{cohort_id}'
+
+
+def load_materials(cohort_id):
+    cohort = Cohort.objects.select_related('course').get(pk=cohort_id)
+    return {
+        'cohort': cohort,
+        'curriculum': list(cohort.course.curriculum_weeks.order_by('week_number')),
+        'assignments': list(cohort.assignments.order_by('week_number')),
+        'instructors': list(cohort.cohort_instructors.select_related('instructor__user')),
+    }
+
+
+def _timeout(timeout):
+    return timeout if settings.SHARED_CACHE else LOCAL_TIMEOUT
+
+
+def load_enrollment(user_id, cohort_id):
+    """The enrollment granting access, or None"""
+    return Enrollment.objects.filter(
+        student_id=user_id, cohort_id=cohort_id, status__in=ACCESS_STATUSES,
+    ).first()
+
+
+def page_context(user, cohort_id):
+    """Everything cohort_materials.html shows; raises Http404 unless ``user``
+    is enrolled in the cohort."""
+    access_key, materials_key = _access_key(user.pk, cohort_id), _key(cohort_id)
+    cached = cache.get_many([access_key, materials_key])
+    record_cache_lookup(access_key in cached)
+    record_cache_lookup(materials_key in cached)
+
+    enrollment = cached.get(access_key)
+    if enrollment is None:
+        enrollment = load_enrollment(user.pk, cohort_id)
+        if enrollment is None:
+            raise Http404('No enrollment in this cohort')
+        cache.set(access_key, enrollment, _timeout(ACCESS_TIMEOUT))
+
+    materials = cached.get(materials_key)
+    if materials is None:
+        materials = load_materials(cohort_id)
+        cache.set(materials_key, materials, _timeout(MATERIALS_TIMEOUT))
+
+    # Cache reads return fresh copies, so the shared assignments can be annotated
+    assignments = materials['assignments']
+    submissions = {}
+    if assignments:
+        submissions = {
+            submission.assignment_id: submission
+            for submission in AssignmentSubmission.objects.filter(
+                student=user, assignment_id__in=[assignment.pk for assignment in assignments],
+            )
+        }
+    for assignment in assignments:
+        assignment.submission = submissions.get(assignment.pk)
+
+    return dict(materials, enrollment=enrollment)
+
+
+def invalidate(*cohort_ids):
+    cache.delete_many([_key(cohort_id) for cohort_id in cohort_ids])
+
+
+def forget_access(user_id, cohort_id):
+    cache.delete(_access_key(user_id, cohort_id))
@@ -0,0 +1,96 @@
+"""Prometheus metrics, served at /metrics.
+
+Under gunicorn each worker keeps its own counters, so gunicorn.conf.py points
+PROMETHEUS_MULTIPROC_DIR at a directory it empties on start. Every process
+writes its samples to mmap'd files there and the /metrics view merges them.
+Processes outside gunicorn, such as the run_outbox worker, serve their own
+samples with start_exporter(). Both scrape targets answer only when
+scrape_allowed() does.
+"""
+import os
+import threading
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, make_wsgi_app,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'risehub_request_duration_seconds', 'Time spent serving a request, by URL name',
+    ['url_name', 'method'],
+)
+REQUEST_QUERIES = Histogram(
+    'risehub_request_db_queries', 'Database queries run by a request, by URL name',
+    ['url_name'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+FORM_SUBMISSIONS = Counter(
+    'risehub_form_submissions_total', 'Form submissions by form and outcome',
+    ['form', 'outcome'],
+)
+EMAILS = Counter(
+    'risehub_emails_total', 'Outbound emails queued, sent, retried or dead-lettered',
+    ['event'],
+)
+
+
+# The method label comes from the client; anything else shares one series
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'}
+
+
+def observe_request(url_name, method, seconds, queries):
+    if method not in KNOWN_METHODS:
+        method = 'other'
+    REQUEST_LATENCY.labels(url_name, method).observe(seconds)
+    REQUEST_QUERIES.labels(url_name).observe(queries)
+
+
+def count_form(form, outcome):
+    """``outcome`` is 'success' or why it failed, e.g. 'invalid' or 'full'"""
+    FORM_SUBMISSIONS.labels(form, outcome).inc()
+
+
+def count_emails(event, amount=1):
+    if amount:
+        EMAILS.labels(event).inc(amount)
+
+
+def render_latest():
+    """Return (body, content type) for the current samples of every process"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def scrape_allowed(authorization):
+    """Whether an ``Authorization`` header may read the metrics: it must carry
+    ``Bearer <METRICS_TOKEN>``, and without a token only DEBUG serves them"""
+    token = settings.METRICS_TOKEN
+    if token:
+        return constant_time_compare(authorization, f'Bearer {token}')
+    return settings.DEBUG
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_exporter(port, addr='0.0.0.0'):
+    """Serve this process's samples over HTTP from a daemon thread; returns the server"""
+    app = make_wsgi_app(REGISTRY)
+
+    def guarded(environ, start_response):
+        if not scrape_allowed(environ.get('HTTP_AUTHORIZATION', '')):
+            start_response('403 Forbidden', [('Content-Type', 'text/plain')])
+            return [b'Forbidden']
+        return app(environ, start_response)
+
+    server = make_server(addr, port, guarded, WSGIServer, QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,346 @@
+"""Per-request performance instrumentation.
+
+PerformanceMiddleware times every request and records its database queries,
+template rendering and cache lookups (pages, roles, materials and choice
+lists, via record_cache_lookup()). The totals go out as a
+``Server-Timing`` header (visible in the browser's network panel) and as one
+log line on ``info_site.performance`` keyed by URL name. Queries slower than
+SLOW_QUERY_THRESHOLD_MS are handed to info_site.slow_queries.
+
+ProfilerMiddleware runs a single request under cProfile when a staff user
+asks for it with ``?_profile=1`` or an ``X-Profile`` header.
+
+ReplicaMiddleware tells info_site.routers which requests may read from the
+replica database, and RoleMiddleware adds the cached ``request.role``.
+
+All of them work under WSGI and ASGI. Per-request state lives in ContextVars,
+which asgiref copies into the threads the async ORM runs queries on.
+"""
+import cProfile
+import logging
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+from django.urls import Resolver404, resolve, reverse
+from django.utils.functional import SimpleLazyObject
+
+from . import roles, routers, slow_queries
+from .metrics import observe_request
+
+logger = logging.getLogger('info_site.performance')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.sql = Counter()
+        self.slow_threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper, see connection.execute_wrapper()"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db_time += elapsed
+            self.queries += 1
+            self.sql[sql] += 1
+            if elapsed >= self.slow_threshold and len(self.slow) < slow_queries.MAX_PER_REQUEST:
+                self.slow.append(slow_queries.SlowCandidate(
+                    sql, params, many, elapsed, slow_queries.call_site(), context['connection'],
+                ))
+
+    def repeated_queries(self, threshold):
+        return [(sql, count) for sql, count in self.sql.most_common() if count > threshold]
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    """Add the query recorder to a connection once.
+
+    It goes first in execute_wrappers (innermost) because
+    connection.execute_wrapper() pops the last entry on exit.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+def current_metrics():
+    """The RequestMetrics of the request being served, or None outside one"""
+    return _current.get()
+
+
+def record_cache_lookup(hit):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def _install_template_timer():
+    if getattr(Template.render, 'timed', False):
+        return
+    original = Template.render
+
+    def render(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return original(self, context)
+        # {% include %} renders nested templates; only time the outermost one
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - started
+
+    render.timed = True
+    Template.render = render
+
+
+class PerformanceMiddleware:
+    """Keep first in MIDDLEWARE so the total covers every other middleware"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _install_template_timer()
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'cache;desc="{metrics.cache_hits} hit, {metrics.cache_misses} miss"',
+        ])
+        match = request.resolver_match
+        url_name = match.view_name if match else 'unresolved'
+        self.report(request, response, metrics, total, url_name)
+        if metrics.slow:
+            # Runs from response.close(), after the server has sent the response
+            response._resource_closers.append(
+                partial(slow_queries.capture, metrics.slow, url_name, request.get_full_path())
+            )
+        return response
+
+    def report(self, request, response, metrics, total, url_name):
+        fields = {
+            'url_name': url_name,
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }
+        observe_request(url_name, request.method, total, metrics.queries)
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'performance': fields})
+
+        for sql, count in metrics.repeated_queries(settings.PERFORMANCE_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                'url_name=%s likely N+1: query ran %d times: %s', url_name, count, sql,
+                extra={'performance': dict(fields, repeated_sql=sql, repeats=count)},
+            )
+
+
+class ProfilerMiddleware:
+    """Place after AuthenticationMiddleware.
+
+    Requests without the trigger pass straight through, and the user is only
+    looked up once the trigger is seen, so normal traffic pays nothing. Profiles
+    are saved to PROFILE_DIR as .prof files; open them with snakeviz, or turn
+    them into a flamegraph with flameprof.
+
+    Under ASGI the profiler watches the event loop thread while the request is
+    awaited, so other requests served meanwhile show up too, and queries run on
+    the ORM's worker thread do not.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def triggered(request):
+        return '_profile' in request.GET or 'HTTP_X_PROFILE' in request.META
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.triggered(request) or not request.user.is_staff:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+        return self.save(request, response, profiler)
+
+    async def __acall__(self, request):
+        if not self.triggered(request) or not (await request.auser()).is_staff:
+            return await self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        return await sync_to_async(self.save)(request, response, profiler)
+
+    def save(self, request, response, profiler):
+        match = request.resolver_match
+        url_name = match.view_name.replace(':', '-') if match else 'unresolved'
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{url_name}-{uuid.uuid4().hex[:8]}.prof"
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(directory / name)
+        prune_profiles(directory, settings.PROFILE_KEEP)
+
+        response['X-Profile-Id'] = name
+        response['X-Profile-Url'] = request.build_absolute_uri(reverse('profile_download', args=[name]))
+        return response
+
+
+def prune_profiles(directory, keep):
+    """Delete all but the ``keep`` newest profiles"""
+    profiles = sorted(directory.glob('*.prof'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale in profiles[keep:]:
+        stale.unlink(missing_ok=True)
+
+
+class ReplicaMiddleware:
+    """Route the reads of safe requests to REPLICA_URL_NAMES and the admin
+    changelists to the replica; only installed when a replica is configured.
+
+    A request that writes, or uses an unsafe method, sets a cookie pinning the
+    visitor to the primary for REPLICA_PIN_SECONDS so they read their own writes.
+    """
+    sync_capable = True
+    async_capable = True
+    pin_cookie = 'primary_pin'
+
+    def __init__(self, get_response):
+        if routers.REPLICA not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def use_replica(self, request):
+        if request.method not in ('GET', 'HEAD') or self.pin_cookie in request.COOKIES:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        if match.namespace == 'admin':
+            return match.url_name.endswith('_changelist')
+        return match.view_name in settings.REPLICA_URL_NAMES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = routers.start_request(self.use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            state = routers.end_request(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        token = routers.start_request(self.use_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = routers.end_request(token)
+        return self.pin(request, response, state)
+
+    def pin(self, request, response, state):
+        if state.wrote or request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                self.pin_cookie, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class RoleMiddleware:
+    """Set request.role, looked up from the role cache on first use; place
+    after AuthenticationMiddleware."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.role = SimpleLazyObject(lambda: roles.get_role(request.user))
+        return self.get_response(request)
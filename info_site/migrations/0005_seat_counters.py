@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_seats(apps, schema_editor):
+    Cohort = apps.get_model('info_site', 'Cohort')
+    Enrollment = apps.get_model('info_site', 'Enrollment')
+    Webinar = apps.get_model('info_site', 'Webinar')
+    WebinarRegistration = apps.get_model('info_site', 'WebinarRegistration')
+
+    enrolled = (
+        Enrollment.objects.filter(cohort=OuterRef('pk'), status__in=['pending', 'enrolled'])
+        .order_by().values('cohort').annotate(total=Count('pk')).values('total')
+    )
+    Cohort.objects.update(seats_taken=Coalesce(Subquery(enrolled), 0))
+
+    registered = (
+        WebinarRegistration.objects.filter(webinar=OuterRef('pk'))
+        .order_by().values('webinar').annotate(total=Count('pk')).values('total')
+    )
+    Webinar.objects.update(seats_taken=Coalesce(Subquery(registered), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('info_site', '0004_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cohort',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='webinar',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('info_site', '0005_seat_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cohort',
+            index=models.Index(fields=['status', 'start_date'], name='cohort_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cohort',
+            index=models.Index(condition=models.Q(('status__in', ['recruiting', 'planning'])), fields=['start_date'], name='cohort_open_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at'], name='contact_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('is_responded', False)), fields=['-created_at'], name='contact_unresponded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['cohort', 'status'], name='enrollment_cohort_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interestform',
+            index=models.Index(fields=['-created_at'], name='interest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interestform',
+            index=models.Index(condition=models.Q(('contacted', False)), fields=['-created_at'], name='interest_uncontacted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webinar',
+            index=models.Index(fields=['is_active', 'date'], name='webinar_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webinar',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date'], name='webinar_upcoming_idx'),
+        ),
+    ]
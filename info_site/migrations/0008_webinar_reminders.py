@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('info_site', '0007_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webinarregistration',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='webinarregistration',
+            index=models.Index(condition=models.Q(('reminded_at__isnull', True)), fields=['webinar'], name='registration_unreminded_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:01
+
+from django.db import migrations, models
+
+
+def split_lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def parse_existing_weeks(apps, schema_editor):
+    WeekCurriculum = apps.get_model('info_site', 'WeekCurriculum')
+    weeks = list(WeekCurriculum.objects.only('topics', 'learning_objectives'))
+    for week in weeks:
+        week.topic_list = split_lines(week.topics)
+        week.objective_list = split_lines(week.learning_objectives)
+    WeekCurriculum.objects.bulk_update(weeks, ['topic_list', 'objective_list'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('info_site', '0009_slow_queries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weekcurriculum',
+            name='objective_list',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='weekcurriculum',
+            name='topic_list',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(parse_existing_weeks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations
+
+# Columns searched with ^ prefixes by admin autocomplete. On PostgreSQL
+# istartswith compiles to UPPER("col"::text) LIKE UPPER(%s), which a btree
+# index on that expression with text_pattern_ops serves whatever the collation.
+# SQLite has no such index type, so it is skipped there.
+PREFIX_INDEXES = [
+    ('user_username_prefix_idx', settings.AUTH_USER_MODEL, 'username'),
+    ('user_email_prefix_idx', settings.AUTH_USER_MODEL, 'email'),
+    ('user_first_name_prefix_idx', settings.AUTH_USER_MODEL, 'first_name'),
+    ('user_last_name_prefix_idx', settings.AUTH_USER_MODEL, 'last_name'),
+    ('course_title_prefix_idx', 'info_site.Course', 'title'),
+    ('cohort_name_prefix_idx', 'info_site.Cohort', 'name'),
+    ('assignment_title_prefix_idx', 'info_site.Assignment', 'title'),
+    ('webinar_title_prefix_idx', 'info_site.Webinar', 'title'),
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for name, model, field in PREFIX_INDEXES:
+        meta = apps.get_model(model)._meta
+        column = meta.get_field(field).column
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(name)} '
+            f'ON {quote(meta.db_table)} (UPPER({quote(column)}::text) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, model, field in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('info_site', '0010_curriculum_lists'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -1,9 +1,78 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, ExpressionWrapper, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from collections import defaultdict
 from decimal import Decimal
 
+def split_lines(text):
+    """Non-blank lines of a "one per line" text field, stripped, in order"""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+class FullyBooked(Exception):
+    """Raised when a cohort or webinar has no seats left to reserve"""
+
+
+class SeatQuerySet(models.QuerySet):
+    """Shared helpers for models that keep a denormalized ``seats_taken`` column"""
+
+    def claim_seat(self, pk):
+        """Take one seat with a conditional UPDATE; False when none are left"""
+        return bool(
+            self.filter(pk=pk, seats_taken__lt=F(self.seat_limit_field))
+            .update(seats_taken=F('seats_taken') + 1)
+        )
+
+    def adjust_seats(self, delta):
+        return self.update(seats_taken=Greatest(F('seats_taken') + delta, 0))
+
+    def with_spots_left(self):
+        """Annotate ``spots_left`` from the seat columns so lists can sort on it"""
+        return self.annotate(
+            spots_left=Greatest(F(self.seat_limit_field) - F('seats_taken'), 0)
+        )
+
+    def recount_seats(self):
+        """Rebuild ``seats_taken`` from the source rows in one UPDATE"""
+        held = (
+            self.seat_holders()
+            .filter(**{self.seat_holder_field: OuterRef('pk')})
+            .order_by()
+            .values(self.seat_holder_field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return self.update(seats_taken=Coalesce(Subquery(held), 0))
+
+
+class SeatHolderQuerySet(models.QuerySet):
+    """Shared delete() for models whose rows hold a seat in ``seat_parent_field``.
+
+    The per-row post_delete receivers in info_site.signals leave queryset
+    deletes alone; this adjusts each parent's counter once instead.
+    """
+
+    def holding_seats(self):
+        return self
+
+    def delete(self):
+        field = self.seat_parent_field
+        parent = self.model._meta.get_field(field).related_model
+        with transaction.atomic(using=self.db, savepoint=False):
+            held = defaultdict(list)
+            for parent_id, total in (self.holding_seats().order_by().values(field)
+                                     .annotate(total=Count('pk')).values_list(field, 'total')):
+                held[total].append(parent_id)
+            deleted = super().delete()
+            # One UPDATE per distinct count, usually a single one
+            for total, parent_ids in held.items():
+                parent.objects.filter(pk__in=parent_ids).adjust_seats(-total)
+        return deleted
+
+
 # Models for Course Management System
 class Course(models.Model):
     """Main course offering - e.g., Digital Literacy 101"""
@@ -23,6 +92,14 @@ class Course(models.Model):
         return self.title
 
 
+class WebinarQuerySet(SeatQuerySet):
+    seat_holder_field = 'webinar'
+    seat_limit_field = 'registration_limit'
+
+    def seat_holders(self):
+        return WebinarRegistration.objects.all()
+
+
 # Webinar Models - Move BEFORE WebinarRegistration references
 class Webinar(models.Model):
     """Free introductory webinars"""
@@ -33,22 +110,48 @@ class Webinar(models.Model):
     zoom_link = models.URLField()
     registration_limit = models.IntegerField(default=50)
     is_active = models.BooleanField(default=True)
+    # Maintained by info_site.signals; rebuild with `manage.py reconcile_seat_counts`
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = WebinarQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['is_active', 'date'], name='webinar_active_date_idx'),
+            models.Index(fields=['date'], condition=Q(is_active=True), name='webinar_upcoming_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.date.strftime('%Y-%m-%d %H:%M')}"
     
     @property
     def registration_count(self):
-        return self.registrations.count()
+        return self.seats_taken
     
     @property
     def spots_remaining(self):
         return max(0, self.registration_limit - self.registration_count)
+    
+    def reserve_seat(self, registration):
+        """Save ``registration`` against this webinar and claim one seat.
+
+        Raises IntegrityError when the email is already registered and
+        FullyBooked when the webinar is full; in both cases nothing is saved.
+        """
+        registration.webinar = self
+        registration._seat_claimed = True
+        with transaction.atomic():
+            registration.save()
+            if not Webinar.objects.claim_seat(self.pk):
+                raise FullyBooked(self)
+        return registration
+
+
+class WebinarRegistrationQuerySet(SeatHolderQuerySet):
+    seat_parent_field = 'webinar'
 
 
 class WebinarRegistration(models.Model):
@@ -62,15 +165,75 @@ class WebinarRegistration(models.Model):
     enrolled_after = models.BooleanField(default=False)
     
     registered_at = models.DateTimeField(auto_now_add=True)
+    reminded_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = WebinarRegistrationQuerySet.as_manager()
     
     class Meta:
         ordering = ['-registered_at']
         unique_together = ['webinar', 'email']
+        indexes = [
+            models.Index(fields=['webinar'], condition=Q(reminded_at__isnull=True), name='registration_unreminded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} - {self.webinar.title}"
 
 
+class EnrollmentQuerySet(SeatHolderQuerySet):
+    seat_parent_field = 'cohort'
+
+    def holding_seats(self):
+        return self.filter(status__in=Enrollment.SEAT_STATUSES)
+
+    def with_payment_status(self):
+        """Annotate ``paid_in_full`` in SQL so ``is_paid`` needs no course lookup"""
+        return self.annotate(paid_in_full=ExpressionWrapper(
+            Q(amount_paid__gte=F('cohort__course__price')),
+            output_field=models.BooleanField(),
+        ))
+
+    def for_dashboard(self):
+        """Everything the student dashboard cards show, in one query.
+
+        Adds ``paid_in_full``, the cohort's next assignment still open
+        (``next_week``, ``next_title``, ``next_due``) and the progress counts
+        ``assignments_total`` and ``assignments_done``.
+        """
+        upcoming = (
+            Assignment.objects
+            .filter(cohort=OuterRef('cohort_id'), due_date__gte=timezone.now())
+            .order_by('due_date')
+        )
+        total = (
+            Assignment.objects
+            .filter(cohort=OuterRef('cohort_id'))
+            .order_by()
+            .values('cohort')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        done = (
+            AssignmentSubmission.objects
+            .filter(assignment__cohort=OuterRef('cohort_id'), student=OuterRef('student_id'), completed=True)
+            .order_by()
+            .values('student')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return (
+            self.select_related('cohort__course')
+            .with_payment_status()
+            .annotate(
+                next_week=Subquery(upcoming.values('week_number')[:1]),
+                next_title=Subquery(upcoming.values('title')[:1]),
+                next_due=Subquery(upcoming.values('due_date')[:1]),
+                assignments_total=Coalesce(Subquery(total), 0),
+                assignments_done=Coalesce(Subquery(done), 0),
+            )
+        )
+
+
 # Enrollment Models - Move BEFORE Cohort references
 class Enrollment(models.Model):
     """Student enrollment in a specific cohort"""
@@ -104,18 +267,61 @@ class Enrollment(models.Model):
     enrolled_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Statuses that occupy one of the cohort's seats
+    SEAT_STATUSES = ('pending', 'enrolled')
+    
+    objects = EnrollmentQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-enrolled_at']
         unique_together = ['student', 'cohort']
+        indexes = [
+            models.Index(fields=['cohort', 'status'], name='enrollment_cohort_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.get_full_name()} - {self.cohort.name}"
     
+    # ``_saved_seat`` is the cohort the row held a seat in when last loaded or
+    # saved; info_site.signals reads it from the database when it is unknown
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names and 'cohort_id' in field_names:
+            instance._saved_seat = instance.seat_cohort_id
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        if fields is not None and {'status', 'cohort', 'cohort_id'}.isdisjoint(fields):
+            return
+        deferred = self.get_deferred_fields()
+        if fields is None and not {'status', 'cohort_id'} & deferred:
+            self._saved_seat = self.seat_cohort_id
+        else:
+            # Only part of the seat state was reloaded
+            self.__dict__.pop('_saved_seat', None)
+    
+    @property
+    def seat_cohort_id(self):
+        """Id of the cohort this enrollment holds a seat in, or None"""
+        return self.cohort_id if self.status in self.SEAT_STATUSES else None
+    
     @property
     def is_paid(self):
+        if hasattr(self, 'paid_in_full'):
+            return self.paid_in_full
         return self.amount_paid >= self.cohort.course.price
 
 
+class CohortQuerySet(SeatQuerySet):
+    seat_holder_field = 'cohort'
+    seat_limit_field = 'max_students'
+
+    def seat_holders(self):
+        return Enrollment.objects.filter(status__in=Enrollment.SEAT_STATUSES)
+
+
 class Cohort(models.Model):
     """A specific offering/session of a course"""
     STATUS_CHOICES = [
@@ -135,21 +341,48 @@ class Cohort(models.Model):
     meeting_day = models.CharField(max_length=20, blank=True, help_text="e.g., Monday")
     meeting_time = models.TimeField(null=True, blank=True)
     zoom_link = models.URLField(blank=True)
+    # Pending + enrolled students; maintained by info_site.signals
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = CohortQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['status', 'start_date'], name='cohort_status_start_idx'),
+            models.Index(
+                fields=['start_date'],
+                condition=Q(status__in=['recruiting', 'planning']),
+                name='cohort_open_start_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.course.title} - {self.name}"
     
     @property
     def current_enrollment_count(self):
-        return self.enrollments.filter(status__in=['pending', 'enrolled']).count()
+        return self.seats_taken
     
     @property
     def spots_remaining(self):
         return max(0, self.max_students - self.current_enrollment_count)
+    
+    def reserve_seat(self, student):
+        """Create a pending enrollment for ``student`` and claim one seat.
+
+        Raises IntegrityError when the student is already enrolled and
+        FullyBooked when the cohort is full; in both cases nothing is saved.
+        """
+        enrollment = Enrollment(student=student, cohort=self, status='pending')
+        # The seat is claimed below, so the post_save counter has nothing to add
+        enrollment._saved_seat = self.pk
+        with transaction.atomic():
+            enrollment.save()
+            if not Cohort.objects.claim_seat(self.pk):
+                raise FullyBooked(self)
+        return enrollment
 
 
 class WeekCurriculum(models.Model):
@@ -161,6 +394,10 @@ class WeekCurriculum(models.Model):
     topics = models.TextField(help_text="One topic per line")
     learning_objectives = models.TextField(blank=True)
     materials_url = models.URLField(blank=True, help_text="Link to slides, resources")
+    # The two text fields above split into lists on save, so pages, search and
+    # API consumers never re-parse them; rebuild with `manage.py backfill_curriculum_lists`
+    topic_list = models.JSONField(default=list, blank=True, editable=False)
+    objective_list = models.JSONField(default=list, blank=True, editable=False)
     
     class Meta:
         ordering = ['course', 'week_number']
@@ -168,6 +405,20 @@ class WeekCurriculum(models.Model):
     
     def __str__(self):
         return f"{self.course.title} - Week {self.week_number}: {self.title}"
+    
+    def parse_lists(self):
+        """Refresh topic_list and objective_list; True if either changed"""
+        topics, objectives = split_lines(self.topics), split_lines(self.learning_objectives)
+        changed = (topics, objectives) != (self.topic_list, self.objective_list)
+        self.topic_list, self.objective_list = topics, objectives
+        return changed
+    
+    def save(self, *args, **kwargs):
+        self.parse_lists()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'topic_list', 'objective_list'}
+        super().save(*args, **kwargs)
 
 # all roles
 class UserProfile(models.Model):
@@ -261,6 +512,10 @@ class InterestForm(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='interest_created_idx'),
+            models.Index(fields=['-created_at'], condition=Q(contacted=False), name='interest_uncontacted_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} - {self.created_at.strftime('%Y-%m-%d')}"
@@ -282,6 +537,10 @@ class ContactMessage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='contact_created_idx'),
+            models.Index(fields=['-created_at'], condition=Q(is_responded=False), name='contact_unresponded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.subject}"
@@ -373,4 +632,59 @@ class AssignmentSubmission(models.Model):
         unique_together = ['assignment', 'student']
     
     def __str__(self):
-        return f"{self.student.get_full_name()} - {self.assignment.title}"
\ No newline at end of file
+        return f"{self.student.get_full_name()} - {self.assignment.title}"
+
+
+# Outgoing email
+class EmailOutbox(models.Model):
+    """Email queued alongside the data that triggered it, delivered by run_outbox"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead-lettered'),
+    ]
+    
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'email outbox'
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=Q(status='pending'), name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.to} - {self.subject}"
+
+
+# Diagnostics
+class SlowQuery(models.Model):
+    """A query that took longer than SLOW_QUERY_THRESHOLD_MS during a request"""
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    duration_ms = models.FloatField()
+    
+    url_name = models.CharField(max_length=200, blank=True)
+    path = models.CharField(max_length=500, blank=True)
+    stack = models.TextField(blank=True, help_text="Project call sites and template line, innermost last")
+    plan = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'slow queries'
+    
+    def __str__(self):
+        return f"{self.url_name or self.path} - {self.duration_ms:.0f}ms"
@@ -0,0 +1,95 @@
+"""Delivery of queued EmailOutbox rows through Django's configured email backend"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+
+from .metrics import count_emails
+from .models import EmailOutbox
+
+# Assumed per send when EMAIL_TIMEOUT is unset, and slack for the database work
+DEFAULT_SEND_SECONDS = 60
+LEASE_MARGIN = timedelta(minutes=1)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at six hours"""
+    delay = settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, 6 * 60 * 60))
+
+
+def lease(batch_size):
+    """How long a claimed batch stays invisible to other workers: long enough
+    to open the connection and time out on every message, so a batch still
+    being sent is never claimed, and sent, twice"""
+    per_send = settings.EMAIL_TIMEOUT or DEFAULT_SEND_SECONDS
+    return timedelta(seconds=(batch_size + 1) * per_send) + LEASE_MARGIN
+
+
+def claim_batch(batch_size):
+    """Lease up to ``batch_size`` due messages so concurrent workers skip them"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(pk__in=ids).update(next_attempt_at=now + lease(batch_size))
+    return list(EmailOutbox.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def deliver_batch(batch_size=None):
+    """Send one batch over a single backend connection.
+
+    Returns a dict counting sent, retried and dead-lettered messages; an empty
+    batch returns all zeros.
+    """
+    batch = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    counts = {'sent': 0, 'retried': 0, 'dead': 0}
+    if not batch:
+        return counts
+
+    connection = mail.get_connection()
+    open_error = None
+    try:
+        connection.open()
+    except Exception as exc:
+        # Count the failure against every message in the batch
+        open_error = exc
+
+    now = timezone.now()
+    for message in batch:
+        message.attempts += 1
+        try:
+            if open_error is not None:
+                raise open_error
+            mail.EmailMessage(
+                message.subject, message.body, settings.DEFAULT_FROM_EMAIL,
+                [message.to], connection=connection,
+            ).send()
+        except Exception as exc:
+            message.last_error = f'{type(exc).__name__}: {exc}'
+            if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                message.status = 'dead'
+                counts['dead'] += 1
+            else:
+                message.next_attempt_at = now + retry_delay(message.attempts)
+                counts['retried'] += 1
+        else:
+            message.status = 'sent'
+            message.sent_at = now
+            message.last_error = ''
+            counts['sent'] += 1
+
+    if open_error is None:
+        connection.close()
+    EmailOutbox.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    for event, amount in counts.items():
+        count_emails(event, amount)
+    return counts
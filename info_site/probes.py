@@ -0,0 +1,97 @@
+"""Representative requests against the site's named routes.
+
+Shared by the diagnostics management commands (query plans, benchmarks) so
+they all exercise the same pages with the same kind of visitor.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+
+from .models import Course, Webinar, Enrollment
+
+# The diagnostics clear the cache before each probe; never the configured one,
+# which in production also holds sessions
+ISOLATED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'probes',
+    },
+}
+
+# ``visitor`` is one of 'anonymous', 'student' or 'staff'
+Probe = namedtuple('Probe', ['name', 'path', 'visitor'])
+
+ADMIN_CHANGELISTS = [
+    'course', 'cohort', 'enrollment', 'webinar', 'webinarregistration',
+    'interestform', 'contactmessage', 'assignmentsubmission',
+]
+
+
+def build_probes():
+    """Return one probe per route, using rows that exist in the current database"""
+    course = Course.objects.filter(is_active=True).order_by('pk').first()
+    webinar = Webinar.objects.filter(is_active=True).order_by('pk').first()
+    enrollment = (
+        Enrollment.objects.filter(status__in=['enrolled', 'completed'])
+        .order_by('pk').first()
+    )
+
+    probes = [
+        Probe('home', reverse('home'), 'anonymous'),
+        Probe('about', reverse('about'), 'anonymous'),
+        Probe('contact', reverse('contact'), 'anonymous'),
+        Probe('facilitators', reverse('facilitators'), 'anonymous'),
+        Probe('webinar_list', reverse('webinar_list'), 'anonymous'),
+        Probe('student_register', reverse('student_register'), 'anonymous'),
+        Probe('login', reverse('login'), 'anonymous'),
+    ]
+    if course:
+        probes.append(Probe('course_syllabus', reverse('course_syllabus', args=[course.pk]), 'anonymous'))
+    if webinar:
+        probes.append(Probe('webinar_register', reverse('webinar_register', args=[webinar.pk]), 'anonymous'))
+    if enrollment:
+        probes += [
+            Probe('student_dashboard', reverse('student_dashboard'), 'student'),
+            Probe('student_profile', reverse('student_profile'), 'student'),
+            Probe('enrollment', reverse('enrollment'), 'student'),
+            Probe('enrollment_payment', reverse('enrollment_payment', args=[enrollment.pk]), 'student'),
+            Probe('cohort_materials', reverse('cohort_materials', args=[enrollment.cohort_id]), 'student'),
+        ]
+    probes += [
+        Probe('instructor_dashboard', reverse('instructor_dashboard'), 'staff'),
+        Probe('admin_dashboard', reverse('admin_dashboard'), 'staff'),
+    ]
+    probes += [
+        Probe(f'admin:{name}', reverse(f'admin:info_site_{name}_changelist'), 'staff')
+        for name in ADMIN_CHANGELISTS
+    ]
+    return probes
+
+
+def build_clients():
+    """Return a logged-in Client per visitor type; visitors without a user are left out"""
+    host = next((h for h in settings.ALLOWED_HOSTS if '*' not in h), 'localhost')
+    clients = {'anonymous': Client(HTTP_HOST=host)}
+
+    enrollment = (
+        Enrollment.objects.filter(status__in=['enrolled', 'completed'])
+        .select_related('student').order_by('pk').first()
+    )
+    staff = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+    for visitor, user in [('student', enrollment and enrollment.student), ('staff', staff)]:
+        if user:
+            client = Client(HTTP_HOST=host)
+            client.force_login(user)
+            clients[visitor] = client
+    return clients
+
+
+def fetch(clients, probe):
+    """GET the probe's page as its visitor; returns None when that visitor is unavailable"""
+    client = clients.get(probe.visitor)
+    if client is None:
+        return None
+    return client.get(probe.path, secure=True)
@@ -0,0 +1,109 @@
+"""A user's role, resolved once and cached.
+
+The role comes from UserProfile.role; superusers are always admins, and users
+without a UserProfile are instructors if they have an InstructorProfile and
+seniors otherwise. It is loaded with the ids of the user's profiles in one
+joined query, cached per user, warmed at login and dropped by info_site.signals
+whenever a profile or the user changes. Dropping it only reaches other worker
+processes through a shared cache, so without SHARED_CACHE roles are cached for
+LOCAL_ROLE_TIMEOUT: a demoted admin keeps access elsewhere for at most that
+long. RoleMiddleware exposes the role lazily as ``request.role``.
+"""
+from collections import namedtuple
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+# Imported as a module: middleware imports this one for RoleMiddleware
+from . import middleware
+
+ROLE_TIMEOUT = 60 * 60 * 6
+LOCAL_ROLE_TIMEOUT = 60
+
+
+class Role(namedtuple('Role', ['name', 'student_profile_id', 'instructor_profile_id'])):
+    __slots__ = ()
+
+    @property
+    def is_admin(self):
+        return self.name == 'admin'
+
+    @property
+    def is_instructor(self):
+        return self.name == 'instructor'
+
+
+ANONYMOUS = Role('anonymous', None, None)
+
+
+def _key(user_id):
+    return f'role:{user_id}'
+
+
+def load_role(user_id):
+    row = (
+        User.objects.filter(pk=user_id)
+        .values('is_superuser', 'userprofile__role', 'student_profile__id', 'instructor_profile__id')
+        .first()
+    )
+    if row is None:
+        return ANONYMOUS
+    if row['is_superuser']:
+        name = 'admin'
+    elif row['userprofile__role']:
+        name = row['userprofile__role']
+    elif row['instructor_profile__id']:
+        name = 'instructor'
+    else:
+        name = 'senior'
+    return Role(name, row['student_profile__id'], row['instructor_profile__id'])
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return ANONYMOUS
+    role = cache.get(_key(user.pk))
+    middleware.record_cache_lookup(role is not None)
+    if role is None:
+        role = warm(user.pk)
+    return role
+
+
+async def aget_role(user):
+    if not user.is_authenticated:
+        return ANONYMOUS
+    role = await cache.aget(_key(user.pk))
+    middleware.record_cache_lookup(role is not None)
+    if role is None:
+        role = await sync_to_async(warm)(user.pk)
+    return role
+
+
+def warm(user_id):
+    role = load_role(user_id)
+    cache.set(_key(user_id), role, ROLE_TIMEOUT if settings.SHARED_CACHE else LOCAL_ROLE_TIMEOUT)
+    return role
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
+
+
+def role_required(*names):
+    """Allow only users whose request.role is one of ``names``; use under login_required.
+
+    Others get a 403. The admin and instructor dashboards used to render for
+    any logged-in user, so that 403 is new behavior for them.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.role.name not in names:
+                raise PermissionDenied
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+"""Routing of reads to the ``replica`` database when DATABASE_REPLICA_URL is set.
+
+ReplicaMiddleware decides per request whether its reads may be served by the
+replica: only safe requests to the public pages and admin changelists, and only
+while the visitor has not written anything recently. Everything else, and
+sessions and auth always, stays on the primary so nobody reads stale data
+about their own actions.
+"""
+from contextvars import ContextVar
+
+from django.db import connections
+
+REPLICA = 'replica'
+
+# Replication lag must never log someone out or hide a password change
+PRIMARY_ONLY_APPS = {'sessions', 'auth', 'contenttypes', 'admin'}
+
+_request_state = ContextVar('replica_state', default=None)
+
+
+class RequestState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def start_request(use_replica):
+    """Begin routing for a request; pass the returned token to end_request()"""
+    return _request_state.set(RequestState(use_replica))
+
+
+def end_request(token):
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if (
+            state is None or not state.use_replica or state.wrote
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or connections['default'].in_atomic_block
+        ):
+            return 'default'
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # Later reads in this request should see the write
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
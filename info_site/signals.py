@@ -0,0 +1,148 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache, choices, materials, roles
+from .models import (
+    Assignment, Course, Cohort, CohortInstructor, Enrollment, InstructorProfile, StudentProfile,
+    UserProfile, WeekCurriculum, Webinar, WebinarRegistration,
+)
+
+
+# Seat counters
+SEAT_FIELDS = {'status', 'cohort', 'cohort_id'}
+
+
+@receiver(pre_save, sender=Enrollment)
+def load_saved_seat(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or hasattr(instance, '_saved_seat'):
+        return
+    if instance._state.adding:
+        instance._saved_seat = None
+    elif update_fields is None or not SEAT_FIELDS.isdisjoint(update_fields):
+        # Loaded without its seat fields, e.g. with only(); ask the database
+        row = Enrollment.objects.filter(pk=instance.pk).values_list('status', 'cohort_id').first()
+        if row is not None:
+            status, cohort_id = row
+            instance._saved_seat = cohort_id if status in Enrollment.SEAT_STATUSES else None
+
+
+@receiver(post_save, sender=Enrollment)
+def update_cohort_seats_on_save(sender, instance, raw=False, **kwargs):
+    if raw or not hasattr(instance, '_saved_seat'):
+        # The save left the seat fields alone
+        return
+    previous = instance._saved_seat
+    current = instance.seat_cohort_id
+    if previous != current:
+        if previous is not None:
+            Cohort.objects.filter(pk=previous).adjust_seats(-1)
+        if current is not None:
+            Cohort.objects.filter(pk=current).adjust_seats(1)
+    instance._saved_seat = current
+
+
+def _counted_elsewhere(origin, sender, parents):
+    """Whether a delete removing ``sender`` rows needs no per-row seat
+    adjustment: it removes the parents too, or is a queryset delete, which
+    SeatHolderQuerySet.delete() adjusts in one go."""
+    if isinstance(origin, models.QuerySet):
+        return issubclass(origin.model, (sender, *parents))
+    return isinstance(origin, parents)
+
+
+@receiver(post_delete, sender=Enrollment)
+def update_cohort_seats_on_delete(sender, instance, origin=None, **kwargs):
+    previous = getattr(instance, '_saved_seat', None)
+    instance._saved_seat = None
+    if previous is not None and not _counted_elsewhere(origin, sender, (Cohort, Course)):
+        Cohort.objects.filter(pk=previous).adjust_seats(-1)
+
+
+@receiver(post_save, sender=WebinarRegistration)
+def update_webinar_seats_on_save(sender, instance, created, raw=False, **kwargs):
+    # Webinar.reserve_seat() claims its own seat with a conditional UPDATE
+    if created and not raw and not getattr(instance, '_seat_claimed', False):
+        Webinar.objects.filter(pk=instance.webinar_id).adjust_seats(1)
+
+
+@receiver(post_delete, sender=WebinarRegistration)
+def update_webinar_seats_on_delete(sender, instance, origin=None, **kwargs):
+    if not _counted_elsewhere(origin, sender, (Webinar,)):
+        Webinar.objects.filter(pk=instance.webinar_id).adjust_seats(-1)
+
+
+def after_commit(func, *args):
+    """Drop cached data once the change is committed. Dropping it earlier
+    lets a request that reads the old rows before the commit cache them again."""
+    transaction.on_commit(partial(func, *args))
+
+
+# Public page cache invalidation
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_pages(sender, instance, **kwargs):
+    after_commit(cache.bump, 'home', f'course:{instance.pk}', choices.GROUP)
+
+
+@receiver([post_save, post_delete], sender=Cohort)
+def invalidate_cohort_pages(sender, instance, **kwargs):
+    after_commit(cache.bump, 'home', choices.GROUP)
+
+
+@receiver([post_save, post_delete], sender=WeekCurriculum)
+def invalidate_curriculum_pages(sender, instance, **kwargs):
+    after_commit(cache.bump, f'course:{instance.course_id}')
+
+
+@receiver([post_save, post_delete], sender=Webinar)
+def invalidate_webinar_pages(sender, instance, **kwargs):
+    after_commit(cache.bump, 'home', 'webinar_list')
+
+
+# Cached cohort materials
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=WeekCurriculum)
+def invalidate_course_materials(sender, instance, **kwargs):
+    course_id = instance.pk if sender is Course else instance.course_id
+    after_commit(materials.invalidate, *Cohort.objects.filter(course_id=course_id).values_list('pk', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Cohort)
+def invalidate_cohort_materials(sender, instance, **kwargs):
+    after_commit(materials.invalidate, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+@receiver([post_save, post_delete], sender=CohortInstructor)
+def invalidate_cohort_materials_rows(sender, instance, **kwargs):
+    after_commit(materials.invalidate, instance.cohort_id)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def forget_materials_access(sender, instance, **kwargs):
+    after_commit(materials.forget_access, instance.student_id, instance.cohort_id)
+
+
+# Cached roles
+@receiver([post_save, post_delete], sender=UserProfile)
+@receiver([post_save, post_delete], sender=StudentProfile)
+@receiver([post_save, post_delete], sender=InstructorProfile)
+def invalidate_profile_role(sender, instance, **kwargs):
+    after_commit(roles.invalidate, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_role(sender, instance, update_fields=None, **kwargs):
+    # Every login saves last_login, which can't change the role
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    after_commit(roles.invalidate, instance.pk)
+
+
+@receiver(user_logged_in)
+def warm_role(sender, request, user, **kwargs):
+    roles.warm(user.pk)
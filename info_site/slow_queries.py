@@ -0,0 +1,116 @@
+"""Capture of queries slower than SLOW_QUERY_THRESHOLD_MS.
+
+PerformanceMiddleware notes each slow query with its call site while the
+request runs. capture() then EXPLAINs and stores them once the response has
+been sent, so the visitor never waits on the diagnostics. Bind values can be
+session keys, emails or phone numbers, so they are only stored, and only left
+in the plan's string literals, with SLOW_QUERY_STORE_PARAMS on.
+"""
+import hashlib
+import logging
+import re
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.template.base import Node
+
+from .models import SlowQuery
+
+logger = logging.getLogger('info_site.slow_queries')
+
+SlowCandidate = namedtuple('SlowCandidate', ['sql', 'params', 'many', 'duration', 'stack', 'connection'])
+
+# A pathological page should not turn into thousands of EXPLAINs
+MAX_PER_REQUEST = 20
+
+_NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+_SKIPPED_FILES = ('middleware.py', 'slow_queries.py')
+_STRING_LITERAL = _NORMALIZE[0][0]
+
+
+def fingerprint(sql):
+    """Hash of the SQL with literals and IN-list lengths folded away"""
+    normalized = sql.strip().lower()
+    for pattern, replacement in _NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def call_site():
+    """The project's frames on the current stack, outermost first, then the
+    template line being rendered, if any."""
+    base = str(settings.BASE_DIR)
+    lines = []
+    template = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if template is None and code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            if isinstance(node, Node) and node.origin is not None and node.token is not None:
+                template = f'template {node.origin.template_name}:{node.token.lineno}'
+        filename = code.co_filename
+        if (filename.startswith(base) and 'site-packages' not in filename
+                and not filename.endswith(_SKIPPED_FILES)):
+            lines.append(f'{Path(filename).relative_to(base)}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    lines.reverse()
+    if template:
+        lines.append(template)
+    return '\n'.join(lines)
+
+
+def explain(candidate):
+    if candidate.many or not candidate.sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    connection = candidate.connection
+    if settings.SLOW_QUERY_EXPLAIN_ANALYZE and connection.vendor == 'postgresql':
+        prefix = connection.ops.explain_query_prefix(analyze=True)
+    else:
+        prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {candidate.sql}', candidate.params)
+            # SQLite returns (id, parent, notused, detail); PostgreSQL one text column
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f'EXPLAIN failed: {exc}'
+
+
+def capture(candidates, url_name, path):
+    """Explain, log and store slow queries noted during a request"""
+    try:
+        rows = []
+        store_params = settings.SLOW_QUERY_STORE_PARAMS
+        for candidate in candidates:
+            plan = explain(candidate)
+            if not store_params:
+                # PostgreSQL plans print the bound values as literals
+                plan = _STRING_LITERAL.sub("'?'", plan)
+            row = SlowQuery(
+                fingerprint=fingerprint(candidate.sql),
+                sql=candidate.sql,
+                params=repr(candidate.params)[:2000] if store_params and not candidate.many else '',
+                duration_ms=round(candidate.duration * 1000, 2),
+                url_name=url_name,
+                path=path[:500],
+                stack=candidate.stack,
+                plan=plan,
+            )
+            logger.warning(
+                'url_name=%s slow query %.1fms fingerprint=%s: %s',
+                url_name, row.duration_ms, row.fingerprint[:12], row.sql,
+            )
+            rows.append(row)
+        SlowQuery.objects.bulk_create(rows)
+    except DatabaseError:
+        logger.exception('Could not store slow queries for %s', path)
@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import asyncio
+import logging
+import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from .models import (
+    Course, Cohort, CohortInstructor, Enrollment, FullyBooked, Webinar, WebinarRegistration,
+    Assignment, AssignmentSubmission, EmailOutbox, ContactMessage, SlowQuery,
+    InstructorProfile, UserProfile, WeekCurriculum
+)
+from . import async_views, choices, materials, roles, urls as site_urls
+from .forms import EnrollmentForm, InterestFormSubmission
+from .management.commands import benchmark_views
+from .management.commands import loadtest
+from .management.commands.loadtest import Session as LoadTestSession, Stats as LoadTestStats
+from .metrics import start_exporter
+from .middleware import ReplicaMiddleware
+from .outbox import claim_batch
+from .roles import load_role
+from .routers import ReplicaRouter
+from .slow_queries import SlowCandidate, capture, fingerprint
+
+
+# The site's URLs with async views routed, as with ASYNC_VIEWS=1
+ASYNC_ROUTES = {'home', 'webinar_list', 'course_syllabus', 'student_dashboard', 'cohort_materials'}
+
+
+class AsyncURLConf:
+    urlpatterns = [
+        path(str(p.pattern), getattr(async_views, p.callback.__name__), name=p.name) if p.name in ASYNC_ROUTES else p
+        for p in site_urls.urlpatterns
+    ]
+
+
+def setUpModule():
+    # Keep the per-request performance log out of the test output
+    logging.getLogger('info_site.performance').setLevel(logging.WARNING)
+
+
+def make_cohort(**kwargs):
+    course = Course.objects.create(title='Digital Literacy 101', description='Basics')
+    defaults = {
+        'course': course,
+        'name': 'Cohort 1',
+        'start_date': date.today() + timedelta(days=14),
+        'end_date': date.today() + timedelta(days=56),
+        'status': 'recruiting',
+    }
+    defaults.update(kwargs)
+    return Cohort.objects.create(**defaults)
+
+
+def make_webinar(**kwargs):
+    defaults = {
+        'title': 'Intro to Smartphones',
+        'description': 'Free intro',
+        'date': timezone.now() + timedelta(days=3),
+        'zoom_link': 'https://zoom.us/j/1',
+    }
+    defaults.update(kwargs)
+    return Webinar.objects.create(**defaults)
+
+
+class SeatCounterTests(TestCase):
+    def setUp(self):
+        self.cohort = make_cohort()
+        self.student = User.objects.create_user('ama', password='x')
+
+    def test_enrollment_status_changes_move_cohort_counter(self):
+        enrollment = Enrollment.objects.create(student=self.student, cohort=self.cohort, status='pending')
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 1)
+
+        enrollment = Enrollment.objects.get(pk=enrollment.pk)
+        enrollment.status = 'dropped'
+        enrollment.save()
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 0)
+
+        enrollment.status = 'enrolled'
+        enrollment.save()
+        enrollment.delete()
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 0)
+
+    def test_partial_loads_and_refreshes_do_not_recount_seats(self):
+        enrollment = Enrollment.objects.create(student=self.student, cohort=self.cohort, status='pending')
+
+        partial = Enrollment.objects.only('id', 'amount_paid').get(pk=enrollment.pk)
+        partial.amount_paid = Decimal('10.00')
+        partial.save(update_fields=['amount_paid'])
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 1)
+
+        partial = Enrollment.objects.only('id').get(pk=enrollment.pk)
+        partial.status = 'dropped'
+        partial.save()
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 0)
+
+        enrollment = Enrollment.objects.get(pk=enrollment.pk)
+        Enrollment.objects.filter(pk=enrollment.pk).update(status='enrolled')
+        Cohort.objects.recount_seats()
+        enrollment.refresh_from_db()
+        enrollment.save()
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 1)
+
+    def test_webinar_registrations_move_webinar_counter(self):
+        webinar = make_webinar(registration_limit=2)
+        registration = WebinarRegistration.objects.create(webinar=webinar, full_name='Kofi', email='k@example.com')
+        webinar.refresh_from_db()
+        self.assertEqual((webinar.registration_count, webinar.spots_remaining), (1, 1))
+
+        registration.delete()
+        webinar.refresh_from_db()
+        self.assertEqual(webinar.registration_count, 0)
+
+    def test_queryset_delete_adjusts_each_webinar_once(self):
+        webinar = make_webinar(registration_limit=50)
+        WebinarRegistration.objects.bulk_create([
+            WebinarRegistration(webinar=webinar, full_name=f'Guest {n}', email=f'g{n}@example.com')
+            for n in range(20)
+        ])
+        Webinar.objects.update(seats_taken=20)
+        with CaptureQueriesContext(connection) as queries:
+            WebinarRegistration.objects.filter(email__startswith='g1').delete()
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        webinar.refresh_from_db()
+        self.assertEqual(webinar.seats_taken, 9)
+
+    def test_queryset_delete_only_counts_seat_holding_enrollments(self):
+        other = make_cohort()
+        for n, (cohort, status) in enumerate([(self.cohort, 'enrolled'), (self.cohort, 'dropped'), (other, 'pending')]):
+            Enrollment.objects.create(student=User.objects.create_user(f's{n}'), cohort=cohort, status=status)
+        Enrollment.objects.all().delete()
+        self.assertEqual(
+            list(Cohort.objects.order_by('pk').values_list('seats_taken', flat=True)), [0, 0]
+        )
+
+    def test_cascade_delete_skips_counter_updates(self):
+        webinar = make_webinar()
+        WebinarRegistration.objects.bulk_create([
+            WebinarRegistration(webinar=webinar, full_name=f'Guest {n}', email=f'g{n}@example.com')
+            for n in range(20)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            webinar.delete()
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE')])
+        self.assertFalse(WebinarRegistration.objects.exists())
+
+    def test_reconcile_rebuilds_counters(self):
+        Enrollment.objects.create(student=self.student, cohort=self.cohort, status='enrolled')
+        Cohort.objects.update(seats_taken=7)
+        call_command('reconcile_seat_counts', stdout=StringIO())
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 1)
+
+
+class SeatReservationTests(TestCase):
+    def test_duplicate_and_full_reservations_save_nothing(self):
+        webinar = make_webinar(registration_limit=1)
+        webinar.reserve_seat(WebinarRegistration(full_name='Kofi', email='k@example.com'))
+        with self.assertRaises(IntegrityError):
+            webinar.reserve_seat(WebinarRegistration(full_name='Kofi', email='k@example.com'))
+        with self.assertRaises(FullyBooked):
+            webinar.reserve_seat(WebinarRegistration(full_name='Esi', email='e@example.com'))
+
+        webinar.refresh_from_db()
+        self.assertEqual(webinar.seats_taken, 1)
+        self.assertEqual(webinar.registrations.count(), 1)
+
+    def test_cohort_reservation_takes_bounded_queries(self):
+        cohort = make_cohort(max_students=1)
+        student = User.objects.create_user('ama', password='x')
+        # savepoint, INSERT, conditional UPDATE, release
+        with self.assertNumQueries(4):
+            cohort.reserve_seat(student)
+        with self.assertRaises(FullyBooked):
+            cohort.reserve_seat(User.objects.create_user('esi', password='x'))
+
+        cohort.refresh_from_db()
+        self.assertEqual(cohort.seats_taken, 1)
+
+
+class ConcurrentRegistrationTests(TransactionTestCase):
+    attempts = 300
+    limit = 40
+
+    def register(self, webinar, n):
+        try:
+            webinar.reserve_seat(WebinarRegistration(full_name=f'Guest {n}', email=f'guest{n}@example.com'))
+            return 'registered'
+        except FullyBooked:
+            return 'full'
+        finally:
+            connection.close()
+
+    def test_parallel_registrations_never_overbook(self):
+        webinar = make_webinar(registration_limit=self.limit)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            outcomes = list(pool.map(lambda n: self.register(webinar, n), range(self.attempts)))
+
+        webinar.refresh_from_db()
+        self.assertEqual(outcomes.count('registered'), self.limit)
+        self.assertEqual(outcomes.count('full'), self.attempts - self.limit)
+        self.assertEqual(webinar.seats_taken, self.limit)
+        self.assertEqual(webinar.registrations.count(), self.limit)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def add_rows(self, n):
+        start = User.objects.count()
+        for i in range(start, start + n):
+            student = User.objects.create_user(f'student{i}', first_name='Ama', last_name=str(i))
+            cohort = make_cohort(name=f'Cohort {i}')
+            enrollment = Enrollment.objects.create(student=student, cohort=cohort, status='enrolled')
+            assignment = Assignment.objects.create(
+                cohort=cohort, week_number=1, title='Week 1', description='Cards', due_date=timezone.now()
+            )
+            AssignmentSubmission.objects.create(assignment=assignment, student=student)
+            WebinarRegistration.objects.create(webinar=make_webinar(), full_name='Kofi', email=f'k{i}@example.com')
+
+    def count_queries(self, url_name):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_changelists_do_not_query_per_row(self):
+        url_names = [
+            'admin:info_site_enrollment_changelist',
+            'admin:info_site_assignmentsubmission_changelist',
+            'admin:info_site_webinarregistration_changelist',
+            'admin:info_site_cohort_changelist',
+            'admin:info_site_webinar_changelist',
+        ]
+        self.add_rows(1)
+        baseline = {name: self.count_queries(name) for name in url_names}
+        self.add_rows(8)
+        for name in url_names:
+            self.assertEqual(self.count_queries(name), baseline[name], name)
+
+    def test_change_forms_do_not_list_related_rows(self):
+        self.add_rows(1)
+        url = reverse('admin:info_site_assignmentsubmission_change', args=[AssignmentSubmission.objects.get().pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.add_rows(8)
+        with self.assertNumQueries(len(ctx)):
+            response = self.client.get(url)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'student3<')
+
+    def test_autocomplete_searches_by_prefix(self):
+        url = reverse('admin:autocomplete')
+        params = {'app_label': 'info_site', 'model_name': 'assignmentsubmission', 'field_name': 'assignment'}
+        self.add_rows(1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {**params, 'term': 'cohort'})
+        self.add_rows(8)
+        # Labels need the cohort, which is joined rather than fetched per row
+        with self.assertNumQueries(len(ctx)):
+            response = self.client.get(url, {**params, 'term': 'cohort'})
+        self.assertEqual(len(response.json()['results']), 9)
+        self.assertEqual(self.client.get(url, {**params, 'term': 'ohort'}).json()['results'], [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class AdminActionTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.cohort = make_cohort()
+        Course.objects.filter(pk=self.cohort.course_id).update(price=Decimal('150.00'))
+        self.enrollments = [
+            Enrollment.objects.create(
+                student=User.objects.create_user(f'student{i}'), cohort=self.cohort, status='interested'
+            )
+            for i in range(5)
+        ]
+        Enrollment.objects.filter(pk=self.enrollments[0].pk).update(amount_paid=Decimal('20.00'))
+
+    def run_action(self, action, query=''):
+        return self.client.post(reverse('admin:info_site_enrollment_changelist') + query, {
+            'action': action,
+            '_selected_action': [e.pk for e in self.enrollments],
+        }, follow=True)
+
+    @mock.patch('info_site.admin.ACTION_CHUNK_SIZE', 2)
+    def test_mark_as_paid_uses_course_price_and_skips_partial_payments(self):
+        response = self.run_action('mark_as_paid')
+        self.assertContains(response, '4 enrollment(s) marked as paid.')
+        amounts = sorted(Enrollment.objects.values_list('amount_paid', flat=True))
+        self.assertEqual(amounts, [Decimal('20.00')] + [Decimal('150.00')] * 4)
+        self.assertFalse(Enrollment.objects.filter(amount_paid=150, payment_date__isnull=True).exists())
+
+    @mock.patch('info_site.admin.ACTION_CHUNK_SIZE', 2)
+    def test_mark_as_enrolled_recounts_seats(self):
+        response = self.run_action('mark_as_enrolled')
+        self.assertContains(response, '5 enrollment(s) marked as enrolled.')
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 5)
+
+    def test_mark_as_enrolled_from_a_status_filtered_changelist(self):
+        response = self.run_action('mark_as_enrolled', '?status__exact=interested')
+        self.assertContains(response, '5 enrollment(s) marked as enrolled.')
+        self.cohort.refresh_from_db()
+        self.assertEqual(self.cohort.seats_taken, 5)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PublicPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cohort = make_cohort()
+        self.webinar = make_webinar()
+
+    def test_anonymous_repeat_views_cost_no_queries(self):
+        for url in [reverse('home'), reverse('webinar_list'), reverse('about'),
+                    reverse('course_syllabus', args=[self.cohort.course_id])]:
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_model_changes_invalidate_dependent_pages(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('about'))
+        self.webinar.registration_limit = 37
+        with self.captureOnCommitCallbacks(execute=True):
+            self.webinar.save()
+        self.assertContains(self.client.get(reverse('home')), '37 spots remaining')
+        with self.assertNumQueries(0):
+            self.client.get(reverse('about'))
+
+    def test_logged_in_visitors_bypass_the_cache(self):
+        self.client.get(reverse('home'))
+        self.client.force_login(User.objects.create_user('ama'))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('home'))
+        self.assertGreater(len(ctx), 0)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, ROOT_URLCONF=AsyncURLConf)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cohort = make_cohort()
+        make_webinar()
+        self.student = User.objects.create_user('ama', first_name='Ama')
+        Enrollment.objects.create(student=self.student, cohort=self.cohort, status='enrolled')
+
+    async def test_public_pages(self):
+        urls = [reverse('home'), reverse('webinar_list'), reverse('course_syllabus', args=[self.cohort.course_id])]
+        for url in urls:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('0 hit, 1 miss', response['Server-Timing'])
+            # Queries made on the ORM's worker thread are still counted
+            self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+            response = await self.async_client.get(url)
+            self.assertIn('db;dur=0.0;desc="0 queries"', response['Server-Timing'])
+
+    async def test_student_pages(self):
+        await self.async_client.aforce_login(self.student)
+        self.assertContains(await self.async_client.get(reverse('student_dashboard')), 'Welcome back, Ama')
+        response = await self.async_client.get(reverse('cohort_materials', args=[self.cohort.pk]))
+        self.assertContains(response, 'Digital Literacy 101')
+
+        other = await sync_to_async(make_cohort)(name='Cohort 2')
+        response = await self.async_client.get(reverse('cohort_materials', args=[other.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class StudentDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user('ama', first_name='Ama')
+        self.client.force_login(self.student)
+
+    def enroll(self, name, amount_paid=Decimal('0.00')):
+        cohort = make_cohort(name=name)
+        Course.objects.filter(pk=cohort.course_id).update(price=Decimal('100.00'))
+        for week in (1, 2, 3):
+            assignment = Assignment.objects.create(
+                cohort=cohort, week_number=week, title=f'Week {week} cards', description='Cards',
+                due_date=timezone.now() + timedelta(days=7 * week - 10),
+            )
+            if week == 1:
+                AssignmentSubmission.objects.create(assignment=assignment, student=self.student, completed=True)
+        return Enrollment.objects.create(student=self.student, cohort=cohort, status='enrolled', amount_paid=amount_paid)
+
+    def test_cards_are_annotated(self):
+        self.enroll('Cohort 1')
+        enrollment = Enrollment.objects.for_dashboard().get()
+        self.assertFalse(enrollment.is_paid)
+        self.assertEqual((enrollment.assignments_done, enrollment.assignments_total), (1, 3))
+        self.assertEqual((enrollment.next_week, enrollment.next_title), (2, 'Week 2 cards'))
+
+    def test_query_count_does_not_grow_with_enrollments(self):
+        self.enroll('Cohort 1')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertContains(response, '1 of 3 done')
+
+        for i in range(2, 6):
+            self.enroll(f'Cohort {i}', amount_paid=Decimal('100.00'))
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertContains(response, 'Week 2 cards', count=5)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CohortMaterialsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cohort = make_cohort()
+        self.student = User.objects.create_user('ama', first_name='Ama')
+        self.enrollment = Enrollment.objects.create(student=self.student, cohort=self.cohort, status='enrolled')
+        self.assignment = Assignment.objects.create(
+            cohort=self.cohort, week_number=1, title='Week 1 cards', description='Cards', due_date=timezone.now(),
+        )
+        AssignmentSubmission.objects.create(assignment=self.assignment, student=self.student, completed=True, score=90)
+        lead = User.objects.create_user('kofi', first_name='Kofi', last_name='Mensah')
+        CohortInstructor.objects.create(
+            cohort=self.cohort, instructor=InstructorProfile.objects.create(user=lead, role='lead'), role='lead',
+        )
+        self.client.force_login(self.student)
+        self.url = reverse('cohort_materials', args=[self.cohort.pk])
+
+    def test_warm_request_makes_one_site_query(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Done - 90%')
+        self.assertContains(response, 'Kofi Mensah')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get(self.url), 'Week 1 cards')
+        self.assertEqual(len([q for q in ctx.captured_queries if 'info_site_' in q['sql']]), 1)
+
+    def test_changes_invalidate_the_cached_page(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Assignment.objects.create(
+                cohort=self.cohort, week_number=2, title='Week 2 cards', description='Cards', due_date=timezone.now(),
+            )
+        self.assertContains(self.client.get(self.url), 'Week 2 cards')
+
+        self.enrollment.status = 'dropped'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enrollment.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_server_timing_counts_materials_lookups(self):
+        self.assertIn('cache;desc="0 hit, 2 miss"', self.client.get(self.url)['Server-Timing'])
+        # The access check and the materials payload
+        self.assertIn('cache;desc="2 hit, 0 miss"', self.client.get(self.url)['Server-Timing'])
+
+    def test_denials_are_not_cached(self):
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(status='pending')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        # As the admin's mark_as_enrolled action does, without signals
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(status='enrolled')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_cached_entries_expire_quickly_without_a_shared_cache(self):
+        for shared, timeouts in [
+            (True, [materials.ACCESS_TIMEOUT, materials.MATERIALS_TIMEOUT]),
+            (False, [materials.LOCAL_TIMEOUT, materials.LOCAL_TIMEOUT]),
+        ]:
+            cache.clear()
+            with self.settings(SHARED_CACHE=shared), mock.patch.object(materials.cache, 'set') as cache_set:
+                self.client.get(self.url)
+            self.assertEqual([call.args[2] for call in cache_set.call_args_list], timeouts)
+
+
+class FormChoiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.open = make_cohort(name='March')
+        self.closed = make_cohort(name='January', status='completed')
+
+    def test_warm_forms_render_and_validate_without_queries(self):
+        EnrollmentForm()
+        InterestFormSubmission()
+        with self.assertNumQueries(0):
+            form = EnrollmentForm({'cohort': self.open.pk, 'agree_to_terms': 'on'})
+            self.assertTrue(form.is_valid())
+            self.assertEqual((form.cleaned_data['cohort'].pk, form.cleaned_data['cohort'].name), (self.open.pk, 'March'))
+            self.assertFalse(EnrollmentForm({'cohort': self.closed.pk, 'agree_to_terms': 'on'}).is_valid())
+
+            form = InterestFormSubmission({
+                'full_name': 'Ama', 'email': 'ama@example.com', 'phone_number': '0244',
+                'interested_course': self.closed.course_id, 'preferred_cohort': self.closed.pk,
+            })
+            self.assertTrue(form.is_valid())
+            self.assertIn('Digital Literacy 101 - January', str(form['preferred_cohort']))
+
+    def test_cohort_changes_refresh_the_choices(self):
+        EnrollmentForm()
+        self.closed.status = 'recruiting'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.closed.save()
+        self.assertEqual([c.id for c in EnrollmentForm().fields['cohort'].objects], [self.open.pk, self.closed.pk])
+
+    def test_cached_entries_are_plain_tuples(self):
+        cohort, = EnrollmentForm().fields['cohort'].objects
+        self.assertEqual((cohort.name, cohort.spots_remaining), ('March', self.open.max_students))
+        self.assertNotIn(b'info_site.models', pickle.dumps(choices.get_open_cohorts() + choices.get_cohorts()))
+
+    def test_submitted_enrollment_reserves_the_chosen_cohort(self):
+        student = User.objects.create_user('ama', password='x')
+        form = EnrollmentForm({'cohort': self.open.pk, 'agree_to_terms': 'on'})
+        self.assertTrue(form.is_valid())
+        form.cleaned_data['cohort'].reserve_seat(student)
+        self.open.refresh_from_db()
+        self.assertEqual(self.open.seats_taken, 1)
+
+
+class CurriculumListTests(TestCase):
+    def test_text_fields_are_split_on_save_and_backfilled(self):
+        course = make_cohort().course
+        week = WeekCurriculum.objects.create(
+            course=course, week_number=1, title='Getting started', description='Basics',
+            topics='  Turning it on\n\nWi-Fi  \r\nSettings', learning_objectives='Connect to Wi-Fi',
+        )
+        self.assertEqual(week.topic_list, ['Turning it on', 'Wi-Fi', 'Settings'])
+        self.assertEqual(week.objective_list, ['Connect to Wi-Fi'])
+
+        WeekCurriculum.objects.update(topics='Email\nPasswords')
+        out = StringIO()
+        call_command('backfill_curriculum_lists', stdout=out)
+        self.assertIn('Updated 1 curriculum week(s).', out.getvalue())
+        week.refresh_from_db()
+        self.assertEqual(week.topic_list, ['Email', 'Passwords'])
+        self.assertContains(self.client.get(reverse('course_syllabus', args=[course.pk]), secure=True), '<li>Passwords</li>')
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class SessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_cohort()
+        make_webinar()
+
+    def test_anonymous_visitors_never_touch_the_session_table(self):
+        with CaptureQueriesContext(connection) as ctx:
+            for url in [reverse('home'), reverse('webinar_list'), reverse('about'), reverse('login')]:
+                response = self.client.get(url)
+                self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+            # Flash messages go in a cookie rather than a session
+            response = self.client.post(reverse('contact'), EmailOutboxTests.contact)
+            self.assertIn('messages', response.cookies)
+        self.assertFalse([q for q in ctx.captured_queries if 'django_session' in q['sql']])
+        self.assertFalse(Session.objects.exists())
+
+    def test_purge_deletes_only_expired_sessions_in_batches(self):
+        for i in range(5):
+            Session.objects.create(session_key=f'old{i}', session_data='', expire_date=timezone.now() - timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=timezone.now() + timedelta(days=1))
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('purge_sessions', batch_size=2, stdout=out)
+        self.assertIn('Deleted 5 expired session(s).', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('DELETE')]), 3)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RoleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ama', password='pw')
+        self.profile = UserProfile.objects.create(user=self.user, role='admin')
+
+    def test_role_loads_in_one_query(self):
+        InstructorProfile.objects.create(user=self.user, role='lead')
+        with self.assertNumQueries(1):
+            role = load_role(self.user.pk)
+        self.assertEqual(role.name, 'admin')
+        self.assertIsNotNone(role.instructor_profile_id)
+        self.assertIsNone(role.student_profile_id)
+
+    def test_dashboard_routing_uses_the_cached_role(self):
+        self.client.login(username='ama', password='pw')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertRedirects(response, reverse('admin_dashboard'))
+        self.assertFalse([q for q in ctx.captured_queries if 'info_site_' in q['sql']])
+
+        self.profile.role = 'instructor'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.assertRedirects(self.client.get(reverse('student_dashboard')), reverse('instructor_dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.delete()
+        self.assertEqual(self.client.get(reverse('student_dashboard')).status_code, 200)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_role_lookups_are_counted(self):
+        self.client.login(username='ama', password='pw')
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertIn('cache;desc="1 hit, 0 miss"', response['Server-Timing'])
+
+    def test_dashboards_are_guarded_by_role(self):
+        self.profile.role = 'senior'
+        self.profile.save()
+        self.client.login(username='ama', password='pw')
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('instructor_dashboard')).status_code, 403)
+
+        # Superusers are admins whatever their profile says
+        self.user.is_superuser = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('instructor_dashboard')).status_code, 200)
+
+    def test_roles_are_dropped_after_the_change_commits(self):
+        stale = roles.warm(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role = 'senior'
+            self.profile.save()
+            # A request reading the old row before the commit caches it again
+            cache.set(f'role:{self.user.pk}', stale)
+        self.assertEqual(roles.get_role(self.user).name, 'senior')
+
+    def test_roles_expire_quickly_without_a_shared_cache(self):
+        for shared, timeout in [(True, roles.ROLE_TIMEOUT), (False, roles.LOCAL_ROLE_TIMEOUT)]:
+            with self.settings(SHARED_CACHE=shared), mock.patch.object(roles.cache, 'set') as cache_set:
+                roles.warm(self.user.pk)
+            self.assertEqual(cache_set.call_args.args[2], timeout)
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(settings.DATABASES, {'replica': {}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def route(self, request, model=Course, write=False):
+        """Return the alias a view's read would use, and the response"""
+        seen = {}
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Enrollment)
+            seen['db'] = self.router.db_for_read(model)
+            return HttpResponse()
+
+        response = ReplicaMiddleware(view)(request)
+        return seen['db'], response
+
+    def test_public_pages_and_changelists_read_from_the_replica(self):
+        for path in ['/', '/webinars/', '/admin/info_site/enrollment/']:
+            db, response = self.route(self.factory.get(path))
+            self.assertEqual(db, 'replica', path)
+            self.assertNotIn('primary_pin', response.cookies)
+
+    def test_everything_else_stays_on_the_primary(self):
+        self.assertEqual(self.route(self.factory.get('/dashboard/'))[0], 'default')
+        self.assertEqual(self.route(self.factory.get('/admin/info_site/enrollment/1/change/'))[0], 'default')
+        self.assertEqual(self.route(self.factory.get('/'), model=Session)[0], 'default')
+        self.assertEqual(self.router.db_for_read(Course), 'default')
+
+    def test_writes_pin_the_visitor_to_the_primary(self):
+        db, response = self.route(self.factory.post('/contact/'))
+        self.assertEqual(db, 'default')
+        self.assertIn('primary_pin', response.cookies)
+
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = '1'
+        self.assertEqual(self.route(request)[0], 'default')
+
+        db, response = self.route(self.factory.get('/'), write=True)
+        self.assertEqual(db, 'default')
+        self.assertIn('primary_pin', response.cookies)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_cohort()
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('info_site.performance', 'INFO') as logs:
+            response = self.client.get(reverse('home'))
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('0 hit, 1 miss', timing)
+        self.assertRegex(logs.output[0], r'url_name=home method=GET status=200 .* queries=[1-9]')
+
+        response = self.client.get(reverse('home'))
+        self.assertIn('db;dur=0.0;desc="0 queries"', response['Server-Timing'])
+        self.assertIn('1 hit, 0 miss', response['Server-Timing'])
+
+    @override_settings(PERFORMANCE_N_PLUS_ONE_THRESHOLD=0)
+    def test_repeated_queries_are_flagged(self):
+        with self.assertLogs('info_site.performance', 'WARNING') as logs:
+            self.client.get(reverse('home'))
+        self.assertIn('likely N+1', logs.output[0])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, OUTBOX_MAX_ATTEMPTS=2)
+class EmailOutboxTests(TestCase):
+    contact = {
+        'name': 'Ama Mensah', 'email': 'ama@example.com',
+        'subject': 'Classes', 'message': 'When is the next cohort?',
+    }
+
+    def test_contact_form_queues_mail_instead_of_sending(self):
+        self.client.post(reverse('contact'), self.contact)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('to', flat=True)),
+            ['ama@example.com', 'info@risehub.site'],
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('run_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+
+    def test_failures_back_off_then_dead_letter(self):
+        message = EmailOutbox.objects.create(to='ama@example.com', subject='Hi', body='Hello')
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('relay down')):
+            call_command('run_outbox', stdout=StringIO())
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), ('pending', 1))
+            self.assertGreater(message.next_attempt_at, timezone.now())
+            self.assertIn('relay down', message.last_error)
+
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            call_command('run_outbox', stdout=StringIO())
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), ('dead', 2))
+
+
+    @override_settings(OUTBOX_BATCH_SIZE=50, EMAIL_TIMEOUT=20)
+    def test_lease_outlasts_a_batch_of_timeouts(self):
+        EmailOutbox.objects.create(to='ama@example.com', subject='Hi', body='Hello')
+        claimed, = claim_batch(50)
+        self.assertGreater(claimed.next_attempt_at, timezone.now() + timedelta(seconds=50 * 20))
+
+    def test_loop_survives_a_dropped_connection(self):
+        results = [OperationalError('server closed the connection'), {'sent': 0, 'retried': 0, 'dead': 0}]
+        with mock.patch('info_site.management.commands.run_outbox.deliver_batch', side_effect=results), \
+                mock.patch('info_site.management.commands.run_outbox.close_old_connections') as close, \
+                mock.patch('time.sleep', side_effect=[None, KeyboardInterrupt]), \
+                self.assertLogs('info_site.outbox', 'ERROR'):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('run_outbox', '--loop', stdout=StringIO())
+        self.assertEqual(close.call_count, 2)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProfilerTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.profile_dir = Path(tmp.name)
+        override = override_settings(PROFILE_DIR=self.profile_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_staff_can_profile_and_download(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        response = self.client.get(reverse('about'), {'_profile': '1'})
+        name = response['X-Profile-Id']
+        self.assertTrue((self.profile_dir / name).is_file())
+        self.assertIn(reverse('profile_download', args=[name]), response['X-Profile-Url'])
+
+        download = self.client.get(reverse('profile_download', args=[name]))
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(self.client.get(reverse('profile_download', args=['missing.prof'])).status_code, 404)
+
+    def test_only_staff_are_profiled(self):
+        response = self.client.get(reverse('about'), {'_profile': '1'}, headers={'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.client.force_login(User.objects.create_user('ama'))
+        self.assertNotIn('X-Profile-Id', self.client.get(reverse('about'), {'_profile': '1'}))
+        self.assertEqual(list(self.profile_dir.iterdir()), [])
+
+        # Downloads are staff-only too
+        response = self.client.get(reverse('profile_download', args=['x.prof']))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryTests(TestCase):
+    def test_slow_queries_are_stored_with_call_site_and_plan(self):
+        cache.clear()
+        make_cohort()
+        with self.assertLogs('info_site.slow_queries', 'WARNING'):
+            self.client.get(reverse('home'))
+        query = SlowQuery.objects.get(sql__contains='FROM "info_site_cohort"')
+        self.assertEqual(query.url_name, 'home')
+        self.assertIn('template info_site/home.html:', query.stack)
+        self.assertIn('info_site/views.py', query.stack)
+        self.assertTrue(query.plan)
+
+        out = StringIO()
+        call_command('slow_query_report', stdout=out)
+        self.assertIn('home x1', out.getvalue())
+
+    def test_params_are_only_stored_when_enabled(self):
+        candidate = SlowCandidate(
+            'SELECT 1 FROM django_session WHERE session_key = %s', ['s3cret-key'], False, 0.5, '', connection,
+        )
+        with self.assertLogs('info_site.slow_queries', 'WARNING'):
+            capture([candidate], 'home', '/')
+            with self.settings(SLOW_QUERY_STORE_PARAMS=True):
+                capture([candidate], 'home', '/')
+        self.assertEqual(
+            list(SlowQuery.objects.order_by('pk').values_list('params', flat=True)), ['', "['s3cret-key']"]
+        )
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a'"),
+            fingerprint("select *  from t where id in (%s) and name = 'bob'"),
+        )
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, METRICS_TOKEN='s3cret')
+class MetricsTests(TestCase):
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_forms_and_requests_are_counted(self):
+        success = self.sample('risehub_form_submissions_total', form='contact', outcome='success')
+        invalid = self.sample('risehub_form_submissions_total', form='contact', outcome='invalid')
+        queued = self.sample('risehub_emails_total', event='queued')
+        self.client.post(reverse('contact'), EmailOutboxTests.contact)
+        self.client.post(reverse('contact'), {})
+        self.assertEqual(self.sample('risehub_form_submissions_total', form='contact', outcome='success'), success + 1)
+        self.assertEqual(self.sample('risehub_form_submissions_total', form='contact', outcome='invalid'), invalid + 1)
+        self.assertEqual(self.sample('risehub_emails_total', event='queued'), queued + 2)
+
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer s3cret'})
+        self.assertContains(response, 'risehub_request_duration_seconds_bucket{le="0.005",method="POST",url_name="contact"}')
+        self.assertContains(response, 'risehub_request_db_queries_count{url_name="contact"}')
+
+    def test_unknown_methods_share_one_label(self):
+        self.client.generic('BREW', reverse('contact'))
+        self.assertGreater(self.sample('risehub_request_duration_seconds_count', url_name='contact', method='other'), 0)
+        self.assertIsNone(REGISTRY.get_sample_value(
+            'risehub_request_duration_seconds_count', {'url_name': 'contact', 'method': 'BREW'},
+        ))
+
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_without_a_token_only_debug_serves_metrics(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_worker_exporter_serves_its_own_counters(self):
+        server = start_exporter(0, '127.0.0.1')
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_port}/metrics'
+        with self.assertRaises(HTTPError):
+            urlopen(url, timeout=5)
+        with urlopen(Request(url, headers={'Authorization': 'Bearer s3cret'}), timeout=5) as response:
+            self.assertIn(b'risehub_emails_total', response.read())
+
+
+class WebinarReminderTests(TestCase):
+    def test_reminders_are_queued_once_per_registrant(self):
+        soon = make_webinar(title='Using WhatsApp', date=timezone.now() + timedelta(hours=20))
+        later = make_webinar(date=timezone.now() + timedelta(days=5))
+        for i in range(5):
+            WebinarRegistration.objects.create(webinar=soon, full_name=f'Guest {i}', email=f'g{i}@example.com')
+        WebinarRegistration.objects.create(webinar=later, full_name='Kofi', email='k@example.com')
+
+        call_command('send_webinar_reminders', '--batch-size=2', stdout=StringIO())
+        call_command('send_webinar_reminders', stdout=StringIO())
+
+        reminders = EmailOutbox.objects.order_by('to')
+        self.assertEqual([m.to for m in reminders], [f'g{i}@example.com' for i in range(5)])
+        self.assertTrue(reminders[0].body.strip().startswith('Dear Guest 0,'))
+        self.assertIn('Using WhatsApp', reminders[0].subject)
+        self.assertFalse(soon.registrations.filter(reminded_at__isnull=True).exists())
+        self.assertTrue(later.registrations.filter(reminded_at__isnull=True).exists())
+
+
+class SeedCommandTests(TestCase):
+    def test_seed_builds_a_consistent_graph(self):
+        call_command('seed_risehub', '--scale=0.0005', stdout=StringIO())
+        self.assertTrue(User.objects.filter(username='seed-admin', is_superuser=True).exists())
+        self.assertGreater(WebinarRegistration.objects.count(), 0)
+        self.assertGreater(AssignmentSubmission.objects.count(), 0)
+        for cohort in Cohort.objects.all():
+            held = cohort.enrollments.filter(status__in=Enrollment.SEAT_STATUSES).count()
+            self.assertEqual(cohort.seats_taken, held)
+
+
+    def test_seed_refuses_a_populated_database_and_uses_the_given_password(self):
+        User.objects.create_user('ama')
+        with self.assertRaises(CommandError):
+            call_command('seed_risehub', '--scale=0.0005', stdout=StringIO())
+
+        out = StringIO()
+        call_command('seed_risehub', '--scale=0.0005', '--force', '--password=correct-horse', stdout=out)
+        self.assertIn("password 'correct-horse'", out.getvalue())
+        self.assertTrue(User.objects.get(username='seed-admin').check_password('correct-horse'))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ExplainQueriesTests(TestCase):
+    def test_explains_uncached_pages_without_writing(self):
+        student = User.objects.create_user('ama')
+        Enrollment.objects.create(student=student, cohort=make_cohort(), status='enrolled')
+        User.objects.create_superuser('admin', 'admin@example.com', 'x')
+        # Warm the page cache, as in production
+        self.client.get(reverse('home'))
+
+        out = StringIO()
+        call_command('explain_queries', 'home', 'student_dashboard', stdout=out)
+        self.assertIn('[default] SELECT', out.getvalue().split('student_dashboard')[0])
+        self.assertIn('student_dashboard', out.getvalue())
+        self.assertFalse(User.objects.filter(last_login__isnull=False).exists())
+        self.assertFalse(Session.objects.exists())
+
+
+class LoadTestSessionTests(SimpleTestCase):
+    def read(self, method, raw):
+        async def run():
+            session = LoadTestSession('http://testserver', None)
+            session.reader = asyncio.StreamReader()
+            # Left open, as on a keep-alive connection
+            session.reader.feed_data(raw)
+            return await asyncio.wait_for(session.read_response(method), timeout=1)
+        return asyncio.run(run())
+
+    def test_bodiless_responses_do_not_wait_for_content_length(self):
+        head = self.read('HEAD', b'HTTP/1.1 200 OK\r\nContent-Length: 5120\r\n\r\n')
+        not_modified = self.read('GET', b'HTTP/1.1 304 Not Modified\r\nContent-Length: 5120\r\n\r\n')
+        self.assertEqual((head.status, head.body, not_modified.status), (200, b'', 304))
+
+    def test_get_reads_content_length_body(self):
+        response = self.read('GET', b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok')
+        self.assertEqual(response.body, b'ok')
+
+    async def serve(self, respond):
+        """A local server that reads each request and answers only if ``respond``"""
+        async def handle(reader, writer):
+            try:
+                while await reader.readuntil(b'\r\n\r\n'):
+                    if respond:
+                        writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok')
+                        await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        return server, f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+
+    def test_hung_requests_time_out_as_errors(self):
+        async def run():
+            server, url = await self.serve(respond=False)
+            async with server:
+                stats = LoadTestStats()
+                session = LoadTestSession(url, None, timeout=0.1)
+                response = await stats.timed('home', session.request('GET', '/'))
+                return response, stats.errors['home'], session.writer
+        self.assertEqual(asyncio.run(run()), (None, 1, None))
+
+    def test_paced_replay_skips_unreadable_timestamps(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as log:
+            log.write('1.2.3.4 - - [10/Oct/2025:13:55:36 +0000] "GET / HTTP/1.1" 200 5\n')
+            log.write('1.2.3.4 - - [yesterday] "GET /about/ HTTP/1.1" 200 5\n')
+        self.addCleanup(os.remove, log.name)
+
+        async def run():
+            server, url = await self.serve(respond=True)
+            async with server:
+                stats = LoadTestStats()
+                command = loadtest.Command(stderr=StringIO())
+                options = {'replay': log.name, 'speed': 1, 'concurrency': 1, 'forwarded_proto': None, 'timeout': 5}
+                await command.replay(stats, options, url)
+                return stats, command.stderr.getvalue()
+        stats, err = asyncio.run(run())
+        self.assertEqual(sum(len(samples) for samples in stats.latencies.values()), 1)
+        self.assertIn('Skipped 1 line(s)', err)
+
+
+class BenchmarkViewsTests(TestCase):
+    command = benchmark_views.Command()
+
+    def test_query_growth_flags_routes_that_query_more_at_larger_scales(self):
+        results = {'scales': {
+            '0.01': {'home': {'queries': 3}, 'webinars': {'queries': 12}, 'new': {'queries': 9}},
+            '0.001': {'home': {'queries': 3}, 'webinars': {'queries': 2}},
+        }}
+        self.assertEqual(
+            self.command.query_growth(results), ['webinars: 2 queries at scale 0.001, 12 at scale 0.01'],
+        )
+
+    def test_compare_flags_more_queries_and_real_slowdowns(self):
+        baseline = {'scales': {'0.01': {
+            'home': {'queries': 3, 'wall_ms': 10.0},
+            'webinars': {'queries': 2, 'wall_ms': 10.0},
+            'syllabus': {'queries': 4, 'wall_ms': 100.0},
+        }}}
+        results = {'scales': {'0.01': {
+            'home': {'queries': 4, 'wall_ms': 10.0},
+            # Relatively slower but under --min-delta-ms
+            'webinars': {'queries': 2, 'wall_ms': 14.0},
+            'syllabus': {'queries': 4, 'wall_ms': 130.0},
+            'new': {'queries': 9, 'wall_ms': 500.0},
+        }}}
+        self.assertEqual(self.command.compare(results, baseline, 0.25, 5.0), [
+            'home @ 0.01: queries 3 -> 4',
+            'syllabus @ 0.01: wall 100.0ms -> 130.0ms',
+        ])
+
+    def test_query_timer_measures_sub_millisecond_queries(self):
+        timer = benchmark_views.QueryTimer()
+        with connection.execute_wrapper(timer), connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertEqual(timer.count, 1)
+        self.assertGreater(timer.seconds, 0)
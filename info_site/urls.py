@@ -1,19 +1,23 @@
 # info_site/urls.py
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import async_views, views
+
+# Read-heavy pages have async versions for ASGI deployments
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     # Public pages
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('about/', views.about_view, name='about'), 
     path('contact/', views.contact_view, name='contact'),
-    path('course/<int:course_id>/', views.course_syllabus_view, name='course_syllabus'),
+    path('course/<int:course_id>/', read_views.course_syllabus_view, name='course_syllabus'),
     path('facilitators/', views.facilitators_view, name='facilitators'),
 
     
     # Webinar pages
-    path('webinars/', views.webinar_list_view, name='webinar_list'),
+    path('webinars/', read_views.webinar_list_view, name='webinar_list'),
     path('webinar/<int:webinar_id>/register/', views.webinar_registration_view, name='webinar_register'),
     
     # Authentication
@@ -22,15 +26,19 @@ urlpatterns = [
     path('logout/', auth_views.LogoutView.as_view(next_page='/'), name='logout'),
     
     # Student portal
-    path('dashboard/', views.student_dashboard_view, name='student_dashboard'),
+    path('dashboard/', read_views.student_dashboard_view, name='student_dashboard'),
     path('profile/', views.student_profile_view, name='student_profile'),
     path('enroll/', views.enrollment_view, name='enrollment'),
     path('enrollment/<int:enrollment_id>/payment/', views.enrollment_payment_view, name='enrollment_payment'),
-    path('cohort/<int:cohort_id>/materials/', views.cohort_materials_view, name='cohort_materials'),
+    path('cohort/<int:cohort_id>/materials/', read_views.cohort_materials_view, name='cohort_materials'),
 
     # Instructor portal
     path('instructor/', views.instructor_dashboard_view, name='instructor_dashboard'),
 
     # Admin portal
     path('admin-dashboard/', views.admin_dashboard_view, name='admin_dashboard'),
+
+    # Monitoring
+    path('metrics', views.metrics_view, name='metrics'),
+    path('profiles/<str:name>', views.profile_download_view, name='profile_download'),
 ]
\ No newline at end of file
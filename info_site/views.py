@@ -1,37 +1,60 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from . import materials
+from .cache import cache_public_page, SEAT_COUNT_TIMEOUT
+from .metrics import count_emails, count_form, render_latest, scrape_allowed
+from .roles import role_required
 from .models import (
-    Course, Cohort, Webinar, WebinarRegistration,
+    Course, Cohort, Webinar,
     InterestForm as InterestFormModel,
-    Enrollment, StudentProfile
+    Enrollment, StudentProfile, FullyBooked, EmailOutbox
 )
 from .forms import (
     InterestFormSubmission, ContactForm, WebinarRegistrationForm,
     StudentRegistrationForm, StudentProfileForm, EnrollmentForm
 )
 
-# import requests
 
 def send_resend_email(to, subject, message):
-    import os
-    # requests.post(
-    #     'https://api.resend.com/emails',
-    #     headers={
-    #         'Authorization': f'Bearer {os.environ.get("RESEND_API_KEY")}',
-    #         'Content-Type': 'application/json',
-    #     },
-    #     json={
-    #         'from': 'Rise Hub <info@risehub.site>',
-    #         'to': [to],
-    #         'subject': subject,
-    #         'text': message,
-    #     }
-    # )
+    """Queue an email in the outbox; `manage.py run_outbox` delivers it.
 
+    Call inside the transaction that saves the data the email is about, so
+    the message is stored if and only if that data is.
+    """
+    EmailOutbox.objects.create(to=to, subject=subject, body=message)
+    count_emails('queued')
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape target; send `Authorization: Bearer <METRICS_TOKEN>`.
+
+    Without METRICS_TOKEN it is only served with DEBUG on.
+    """
+    if not scrape_allowed(request.headers.get('Authorization', '')):
+        return HttpResponseForbidden()
+    body, content_type = render_latest()
+    return HttpResponse(body, content_type=content_type)
+
+
+@staff_member_required
+def profile_download_view(request, name):
+    """Download a profile saved by ProfilerMiddleware"""
+    path = settings.PROFILE_DIR / name
+    if not name.endswith('.prof') or not path.is_file():
+        raise Http404
+    return FileResponse(path.open('rb'), as_attachment=True, filename=name)
+
+
+@cache_public_page('home', timeout=SEAT_COUNT_TIMEOUT)
 def home(request):
     active_courses = Course.objects.filter(is_active=True)
     upcoming_cohorts = Cohort.objects.filter(
@@ -52,10 +75,12 @@ def home(request):
     return render(request, 'info_site/home.html', context)
 
 
+@cache_public_page()
 def about_view(request):
     return render(request, 'info_site/about.html', {'page_title': 'About Us'})
 
 
+@cache_public_page()
 def facilitators_view(request):
     return render(request, 'info_site/facilitators.html')
 
@@ -64,10 +89,10 @@ def contact_view(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
-            contact = form.save()
+            with transaction.atomic():
+                contact = form.save()
 
-            # FIX: was sending to info@rophejewels.com
-            try:
+                # FIX: was sending to info@rophejewels.com
                 send_resend_email(
                     to=settings.ADMIN_EMAIL,
                     subject=f'New Contact Form: {contact.subject}',
@@ -85,9 +110,6 @@ Message:
 ---
 Submitted at: {contact.created_at.strftime('%B %d, %Y at %I:%M %p')}
                     ''',
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=[settings.ADMIN_EMAIL],
-                    fail_silently=True,
                 )
 
                 send_resend_email(
@@ -106,18 +128,15 @@ The Rise Hub Team
 ---
 Contact us at info@risehub.site for any questions.
                     ''',
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=[contact.email],
-                    fail_silently=True,
                 )
-            except Exception as e:
-                print(f"Email error: {e}")
 
+            count_form('contact', 'success')
             messages.success(
                 request,
                 "Thank you for contacting us! We'll respond to your message shortly."
             )
             return redirect('home')
+        count_form('contact', 'invalid')
     else:
         form = ContactForm()
 
@@ -128,6 +147,7 @@ Contact us at info@risehub.site for any questions.
     return render(request, 'info_site/contact.html', context)
 
 
+@cache_public_page('webinar_list', timeout=SEAT_COUNT_TIMEOUT)
 def webinar_list_view(request):
     from django.utils import timezone
     upcoming_webinars = Webinar.objects.filter(
@@ -149,32 +169,14 @@ def webinar_registration_view(request, webinar_id):
         form = WebinarRegistrationForm(request.POST)
         if form.is_valid():
             registration = form.save(commit=False)
-            registration.webinar = webinar
-
-            # FIX: WebinarRegistration was not imported before
-            if WebinarRegistration.objects.filter(
-                webinar=webinar,
-                email=registration.email
-            ).exists():
-                messages.warning(
-                    request,
-                    'You are already registered for this webinar. Check your email for the Zoom link.'
-                )
-                return redirect('webinar_list')
-
-            if webinar.spots_remaining <= 0:
-                messages.error(
-                    request,
-                    'Sorry, this webinar is fully booked. Please check for other upcoming webinars.'
-                )
-                return redirect('webinar_list')
-
-            registration.save()
 
             try:
-                send_resend_email(
-                    subject=f'Confirmed: {webinar.title}',
-                    message=f'''
+                with transaction.atomic():
+                    webinar.reserve_seat(registration)
+                    send_resend_email(
+                        to=registration.email,
+                        subject=f'Confirmed: {webinar.title}',
+                        message=f'''
 Dear {registration.full_name},
 
 You're confirmed for our free webinar!
@@ -189,19 +191,30 @@ We'll send a reminder 24 hours before the webinar.
 
 Best regards,
 The Rise Hub Team
-                    ''',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[registration.email],
-                    fail_silently=True,
+                        ''',
+                    )
+            except IntegrityError:
+                count_form('webinar_registration', 'duplicate')
+                messages.warning(
+                    request,
+                    'You are already registered for this webinar. Check your email for the Zoom link.'
+                )
+                return redirect('webinar_list')
+            except FullyBooked:
+                count_form('webinar_registration', 'full')
+                messages.error(
+                    request,
+                    'Sorry, this webinar is fully booked. Please check for other upcoming webinars.'
                 )
-            except Exception as e:
-                print(f"Email error: {e}")
+                return redirect('webinar_list')
 
+            count_form('webinar_registration', 'success')
             messages.success(
                 request,
                 f"You're registered for {webinar.title}! Check your email for the Zoom link."
             )
             return redirect('webinar_list')
+        count_form('webinar_registration', 'invalid')
     else:
         form = WebinarRegistrationForm()
 
@@ -213,6 +226,7 @@ The Rise Hub Team
     return render(request, 'info_site/webinar_registration.html', context)
 
 
+@cache_public_page('course:{course_id}')
 def course_syllabus_view(request, course_id):
     course = get_object_or_404(Course, id=course_id, is_active=True)
     # FIX: was using 'curriculum' — correct related name is 'curriculum_weeks'
@@ -234,11 +248,13 @@ def student_registration_view(request):
             login(request, user)
             from .models import UserProfile
             UserProfile.objects.create(user=user, role='senior')
+            count_form('student_registration', 'success')
             messages.success(
                 request,
                 'Welcome to Rise Hub! Please complete your profile to enroll in courses.'
             )
             return redirect('student_profile')
+        count_form('student_registration', 'invalid')
     else:
         form = StudentRegistrationForm()
 
@@ -290,17 +306,12 @@ def student_profile_view(request):
 
 @login_required
 def student_dashboard_view(request):
-    try:
-        role = request.user.userprofile.role
-    except:
-        role = 'senior'
-    
-    if role == 'admin':
+    if request.role.is_admin:
         return redirect('admin_dashboard')
-    elif role == 'instructor':
+    elif request.role.is_instructor:
         return redirect('instructor_dashboard')
     
-    enrollments = request.user.enrollments.all().order_by('-enrolled_at')
+    enrollments = request.user.enrollments.for_dashboard().order_by('-enrolled_at')
     context = {
         'enrollments': enrollments,
         'page_title': 'My Dashboard',
@@ -324,26 +335,25 @@ def enrollment_view(request):
         if form.is_valid():
             cohort = form.cleaned_data['cohort']
 
-            if Enrollment.objects.filter(student=request.user, cohort=cohort).exists():
+            try:
+                enrollment = cohort.reserve_seat(request.user)
+            except IntegrityError:
+                count_form('enrollment', 'duplicate')
                 messages.warning(request, 'You are already enrolled in this cohort.')
                 return redirect('student_dashboard')
-
-            if cohort.spots_remaining <= 0:
+            except FullyBooked:
+                count_form('enrollment', 'full')
                 messages.error(request, 'Sorry, this cohort is full. Please select another start date.')
                 return redirect('enrollment')
 
-            enrollment = Enrollment.objects.create(
-                student=request.user,
-                cohort=cohort,
-                status='pending'
-            )
-
+            count_form('enrollment', 'success')
             messages.success(
                 request,
                 f"You've been enrolled in {cohort.name}! "
                 f"We'll contact you within 24 hours to schedule your assessment call."
             )
             return redirect('enrollment_payment', enrollment_id=enrollment.id)
+        count_form('enrollment', 'invalid')
     else:
         form = EnrollmentForm()
 
@@ -376,29 +386,12 @@ def enrollment_payment_view(request, enrollment_id):
 
 @login_required
 def cohort_materials_view(request, cohort_id):
-    cohort = get_object_or_404(Cohort, id=cohort_id)
-
-    enrollment = get_object_or_404(
-        Enrollment,
-        student=request.user,
-        cohort=cohort,
-        status__in=['enrolled', 'completed']
-    )
-
-    # FIX: was using cohort.course.curriculum — correct related name is curriculum_weeks
-    curriculum = cohort.course.curriculum_weeks.all().order_by('week_number')
-    assignments = cohort.assignments.all().order_by('week_number')
-
-    context = {
-        'cohort': cohort,
-        'enrollment': enrollment,
-        'curriculum': curriculum,
-        'assignments': assignments,
-        'page_title': f'{cohort.name} - Materials',
-    }
+    context = materials.page_context(request.user, cohort_id)
+    context['page_title'] = f"{context['cohort'].name} - Materials"
     return render(request, 'info_site/cohort_materials.html', context)
 
 @login_required
+@role_required('instructor', 'admin')
 def instructor_dashboard_view(request):
     context = {
         'page_title': 'Instructor Dashboard',
@@ -407,6 +400,7 @@ def instructor_dashboard_view(request):
 
 
 @login_required
+@role_required('admin')
 def admin_dashboard_view(request):
     context = {
         'page_title': 'Admin Dashboard',
@@ -34,12 +34,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'info_site.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'info_site.middleware.RoleMiddleware',
+    'info_site.middleware.ReplicaMiddleware',
+    'info_site.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,6 +77,56 @@ DATABASES = {
     )
 }
 
+# Optional read replica, e.g. sqlite:///replica.sqlite3 (a copy of db.sqlite3)
+# locally. info_site.routers sends public page and admin changelist reads to
+# it; tests use the primary.
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ['DATABASE_REPLICA_URL'],
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['info_site.routers.ReplicaRouter']
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Queue concurrent writers instead of failing with "database is locked";
+    # the test database lives in a file so threaded tests get the same behaviour.
+    # Options given in DATABASE_URL win.
+    sqlite_options = DATABASES['default'].setdefault('OPTIONS', {})
+    sqlite_options.setdefault('timeout', 20)
+    sqlite_options.setdefault('transaction_mode', 'IMMEDIATE')
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', BASE_DIR / 'test_db.sqlite3')
+
+# Safe requests to these pages may read from the replica, as may admin changelists
+REPLICA_URL_NAMES = ['home', 'about', 'facilitators', 'webinar_list', 'course_syllabus']
+# How long a visitor reads from the primary after they write something
+REPLICA_PIN_SECONDS = 15
+
+# Redis (requires the redis package) when REDIS_URL is set so every gunicorn
+# worker shares one cache; otherwise a per-process in-memory cache. The key
+# prefix changes per deploy so cached pages never outlive a template change.
+CACHE_KEY_PREFIX = os.environ.get('RAILWAY_GIT_COMMIT_SHA', '')[:12]
+# Whether every worker sees the same cache; per-user state (sessions, roles)
+# is only cached for long when it is
+SHARED_CACHE = bool(os.environ.get('REDIS_URL'))
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'risehub',
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -102,6 +156,18 @@ handler403 = 'info_site.views.access_forbidden'
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = not DEBUG
+
+# With a shared cache, sessions are read from it and written through to the
+# database, so a cache miss or restart never logs anyone out. A per-process
+# cache would keep a logged-out session alive in the other workers, so without
+# one sessions stay in the database. Flash messages live in a cookie, so
+# anonymous visitors never get a session row; run `manage.py purge_sessions`
+# on a schedule to drop expired rows.
+if SHARED_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 CSRF_COOKIE_SECURE = not DEBUG
 
 # FIX: was "SECURE_SSL_REDIRECT = TrueSECURE_HSTS_SECONDS = 31536000" (syntax error)
@@ -119,5 +185,60 @@ LOGIN_REDIRECT_URL = 'student_dashboard'
 LOGOUT_REDIRECT_URL = 'home'
 
 # Email Settings 
-EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
-ADMIN_EMAIL = 'info@risehub.site'
\ No newline at end of file
+# Mail is queued in EmailOutbox and sent by `manage.py run_outbox --loop`, which
+# must run as its own service (on Railway, a second service using
+# railway.worker.json); point the backend at Resend's SMTP relay by setting
+# EMAIL_BACKEND and RESEND_API_KEY.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.dummy.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.resend.com')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', 'resend')
+EMAIL_HOST_PASSWORD = os.environ.get('RESEND_API_KEY', '')
+EMAIL_USE_TLS = True
+EMAIL_TIMEOUT = 20
+DEFAULT_FROM_EMAIL = 'Rise Hub <info@risehub.site>'
+ADMIN_EMAIL = 'info@risehub.site'
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BASE_SECONDS = 60
+
+# Serve the read-heavy pages from info_site.async_views. Set together with
+# running gunicorn's uvicorn workers (gunicorn.conf.py does both from this variable).
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
+# Bearer token required to scrape /metrics and the run_outbox exporter; while
+# unset they are only served with DEBUG on
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# info_site.middleware.PerformanceMiddleware flags SQL repeated more than this
+# many times in one request as a likely N+1
+PERFORMANCE_N_PLUS_ONE_THRESHOLD = 5
+
+# Staff can profile a request with ?_profile=1 or an X-Profile header; the
+# newest PROFILE_KEEP .prof files are kept here
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles'))
+PROFILE_KEEP = 50
+
+# Queries slower than this are stored as SlowQuery rows with their EXPLAIN plan;
+# summarize them with `manage.py slow_query_report`. EXPLAIN ANALYZE re-runs the
+# query, so it is opt-in and PostgreSQL only.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE') == '1'
+# Bind values can be session keys, emails or phone numbers, which staff browsing
+# the admin should not see, so storing them is opt-in too
+SLOW_QUERY_STORE_PARAMS = os.environ.get('SLOW_QUERY_STORE_PARAMS') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'info_site': {
+            'handlers': ['console'],
+            'level': os.environ.get('INFO_SITE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}